@@ -81,6 +81,7 @@ class BTOOLS_PT_material_tools(bpy.types.Panel):
         col.operator("object.face_map_remove", icon="REMOVE", text="")
         col.separator()
         col.operator("btools.face_map_clear", icon="TRASH", text="")
+        col.operator("btools.face_map_assign_materials", icon="MATERIAL", text="")
 
         if ob.face_maps and (ob.mode == "EDIT" and ob.type == "MESH"):
             row = layout.row()
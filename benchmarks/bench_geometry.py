@@ -0,0 +1,89 @@
+""" Micro-benchmark of the straight skeleton geometry hot paths.
+
+Compares the allocating Vector2/Point2 operations against the helpers the
+skeleton core uses, on the points of a polygon with 1k+ vertices.
+
+    python benchmarks/bench_geometry.py [--vertices 1200] [--repeat 5]
+"""
+
+import timeit
+import argparse
+
+from footprints import load_skeleton, random_star
+
+sk = load_skeleton()
+
+
+def cases(points):
+    """ (name, allocating version, helper version) for each hot path
+    """
+    P = [sk.Point2(x, y) for x, y in points]
+    segments = [sk.LineSegment2(a, b) for a, b in zip(P, P[1:] + P[:1])]
+    pairs = list(zip(segments, segments[2:] + segments[:2]))
+
+    def hash_repr():
+        for p in P:
+            hash(repr(p))
+
+    def hash_tuple():
+        for p in P:
+            hash(p)
+
+    def cross_normalized():
+        for a, b in pairs:
+            sk.cross(a.v.normalized(), (b.p - a.p).normalized())
+
+    def cross_unit():
+        for a, b in pairs:
+            sk.unit_cross(a.v.x, a.v.y, b.p.x - a.p.x, b.p.y - a.p.y)
+
+    def dot_normalized():
+        for a, b in pairs:
+            a.v.normalized().dot(b.v.normalized())
+
+    def dot_unit():
+        for a, b in pairs:
+            sk.unit_dot(a.v.x, a.v.y, b.v.x, b.v.y)
+
+    def intersect_copy():
+        for a, b in pairs:
+            sk.Line2(a).intersect(sk.Line2(b))
+
+    def intersect_lines():
+        for a, b in pairs:
+            sk._intersect_lines(b, a)
+
+    def distance_copy():
+        for a, b in pairs:
+            sk.Line2(a).distance(b.p)
+
+    def distance_line():
+        for a, b in pairs:
+            sk._distance_to_line(b.p, a)
+
+    return [
+        ("hash", hash_repr, hash_tuple),
+        ("cross", cross_normalized, cross_unit),
+        ("dot", dot_normalized, dot_unit),
+        ("intersect", intersect_copy, intersect_lines),
+        ("distance", distance_copy, distance_line),
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vertices", type=int, default=1200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    points = random_star(args.vertices)
+    print("{} vertices, best of {}".format(len(points), args.repeat))
+    print("{:<10} {:>12} {:>12} {:>8}".format("op", "before (ms)", "after (ms)", "speedup"))
+    for name, before, after in cases(points):
+        t_before = min(timeit.repeat(before, number=10, repeat=args.repeat)) * 100
+        t_after = min(timeit.repeat(after, number=10, repeat=args.repeat)) * 100
+        print("{:<10} {:>12.3f} {:>12.3f} {:>7.1f}x".format(name, t_before, t_after, t_before / t_after))
+
+
+if __name__ == "__main__":
+    main()
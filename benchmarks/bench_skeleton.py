@@ -0,0 +1,205 @@
+""" Benchmark and regression suite for the straight skeleton.
+
+Runs skeletonize on synthetic footprints (see footprints.py) and reports wall
+time, events processed and peak memory for each. Results are compared with
+the stored baseline, a run fails when a case got slower or heavier than the
+tolerance allows, or when its skeleton changed.
+
+    python benchmarks/bench_skeleton.py [--max-vertices 1000] [--repeat 3]
+                                        [--tolerance 1.5] [--only NAME] [--update]
+
+Timings depend on the machine, regenerate the baseline with --update before
+comparing on a new one. The stored skeletons always come from the reference,
+util_skeleton.py before it was optimized, kept as reference_skeleton.py.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import argparse
+import tracemalloc
+
+import footprints as fp
+
+sk = fp.load_skeleton()
+
+BASELINE = os.path.join(os.path.dirname(__file__), "skeleton_baseline.json")
+
+# -- wall time is only compared for cases that take at least this long
+MIN_SECONDS = 0.01
+
+# -- tracemalloc needs a few times the memory of the run it traces, larger
+# cases do not fit in a few GiB with it and go without peak memory
+TRACE_MAX_VERTICES = 1000
+
+# -- copy of utils/util_skeleton.py before it was optimized
+REFERENCE = os.path.join(os.path.dirname(__file__), "reference_skeleton.py")
+
+
+def cases():
+    """ (name, factory) for each footprint, factory returns (polygon, holes)
+
+    Random stars above ~600 vertices and regular courtyard grids hit known
+    degenerate cases of skeletonize, so those families stop earlier.
+    """
+    yield "rectangle", lambda: (fp.rectangle(), [])
+    yield "l_shape", lambda: (fp.l_shape(), [])
+    yield "u_shape", lambda: (fp.u_shape(), [])
+    yield "h_shape", lambda: (fp.h_shape(), [])
+    for size in (10, 100, 1000):
+        yield "star_%d" % size, lambda n=size: (fp.star(n // 2), [])
+    for size in (10, 100, 500):
+        yield "random_star_%d" % size, lambda n=size: (fp.random_star(n), [])
+    for size in (10, 100, 1000, 10000):
+        yield "comb_%d" % size, lambda n=size: (fp.comb(n // 4), [])
+        yield "random_orthogonal_%d" % size, lambda n=size: (
+            fp.random_orthogonal((n - 2) // 2), []
+        )
+    for grid in (1, 4, 10):
+        yield "courtyards_%d" % grid, lambda n=grid: fp.courtyards(n)
+
+
+class CountingQueue(sk.EventQueue):
+    """ EventQueue that keeps the last instance to read its counters
+    """
+
+    last = None
+
+    def __init__(self):
+        super().__init__()
+        CountingQueue.last = self
+
+
+def signature(skeleton):
+    """ Rounded digest of the nodes and edges of a skeleton to detect changes,
+    independent of their order and of how the edges are grouped into arcs
+    """
+    nodes, edges = set(), set()
+    for arc in skeleton:
+        source = (round(arc.source.x, 6), round(arc.source.y, 6))
+        nodes.add(source + (round(arc.height, 6),))
+        for p in arc.sinks:
+            sink = (round(p.x, 6), round(p.y, 6))
+            if sink != source:
+                edges.add(tuple(sorted((source, sink))))
+    digest = repr((sorted(nodes), sorted(edges))).encode()
+    return "%d:%08x" % (len(edges), zlib.crc32(digest))
+
+
+def load_reference(path=REFERENCE):
+    """ The reference skeleton module at path
+    """
+    return fp.load_skeleton(path, "util_skeleton_reference")
+
+
+def run(polygon, holes, repeat, trace=True):
+    """ Best wall time, events processed, peak memory (KiB) and signature,
+    peak memory is None without trace
+    """
+    sk.EventQueue = CountingQueue
+    try:
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            skeleton = sk.skeletonize(polygon, holes)
+            best = min(best, time.perf_counter() - start)
+        # -- stale events are popped off the heap too
+        events = CountingQueue.last.pops + CountingQueue.last.stale
+        # -- only the signature is kept, the 10k cases do not fit in memory twice
+        sig, skeleton = signature(skeleton), None
+
+        peak = None
+        if trace:
+            tracemalloc.start()
+            sk.skeletonize(polygon, holes)
+            peak = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+    finally:
+        sk.EventQueue = CountingQueue.__bases__[0]
+    return best, events, peak, sig
+
+
+def compare(name, result, baseline, tolerance):
+    """ Reasons why result regressed from baseline
+    """
+    if baseline is None:
+        return []
+    failures = []
+    if result["signature"] != baseline["signature"]:
+        failures.append("skeleton changed")
+    # -- timings of short cases are mostly noise, see test_skeleton.py for
+    # the skeletons of those
+    if baseline["seconds"] >= MIN_SECONDS and (
+        result["seconds"] > baseline["seconds"] * tolerance
+    ):
+        failures.append("%.4fs > %.4fs" % (result["seconds"], baseline["seconds"]))
+    if None not in (result["peak_kib"], baseline["peak_kib"]) and (
+        result["peak_kib"] > max(baseline["peak_kib"] * tolerance, 64)
+    ):
+        failures.append("%.0fKiB > %.0fKiB" % (result["peak_kib"], baseline["peak_kib"]))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-vertices", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=1.5)
+    parser.add_argument("--only", default="", help="run cases whose name contains this")
+    parser.add_argument("--update", action="store_true", help="store results as baseline")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument(
+        "--reference", default=REFERENCE, help="util_skeleton.py the stored skeletons come from"
+    )
+    args = parser.parse_args()
+    reference = load_reference(args.reference) if args.update else None
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    print("%-24s %6s %10s %8s %10s  %s" % ("case", "verts", "seconds", "events", "peak KiB", ""))
+    results, failed = {}, []
+    for name, factory in cases():
+        if args.only not in name:
+            continue
+        polygon, holes = factory()
+        vertices = len(polygon) + sum(len(h) for h in holes)
+        if vertices > args.max_vertices:
+            continue
+
+        seconds, events, peak, sig = run(
+            polygon, holes, args.repeat, trace=vertices <= TRACE_MAX_VERTICES
+        )
+        result = results[name] = dict(
+            vertices=vertices, seconds=seconds, events=events, peak_kib=peak, signature=sig
+        )
+        if reference:
+            result["signature"] = signature(reference.skeletonize(polygon, holes))
+        failures = [] if args.update else compare(
+            name, result, baselines.get(name), args.tolerance
+        )
+        if failures:
+            failed.append(name)
+        print(
+            "%-24s %6d %10.4f %8d %10s  %s"
+            % (name, vertices, seconds, events, "-" if peak is None else "%.0f" % peak,
+               "; ".join(failures) or "ok")
+        )
+
+    if args.update:
+        baselines.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print("baseline written to %s" % args.baseline)
+    elif failed:
+        print("%d regressed: %s" % (len(failed), ", ".join(failed)))
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+""" Before/after mesh comparison of window, door and multigroup presets.
+
+Builds each preset on the side walls of a box with the add-on at --addon and
+saves a signature of the mesh, or compares it with the one saved before.
+Needs a blender that still has face maps (2.8x - 3.x), the reference add-on
+is checked out next to this one:
+
+    git worktree add ../reference <revision>
+    blender -b --factory-startup -P benchmarks/compare_presets.py -- --addon ../reference --save before.json
+    blender -b --factory-startup -P benchmarks/compare_presets.py -- --compare before.json
+"""
+
+import os
+import sys
+import json
+import argparse
+import importlib
+
+import bpy
+import bmesh
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# -- (builder, property values) of each preset, the builders are in core/<builder>/
+PRESETS = {
+    "window": ("window", {"count": 3}),
+    "window_bars": ("window", {"count": 2, "fill_type": "BAR"}),
+    "window_panes_arch": ("window", {"count": 3, "fill_type": "GLASS_PANES", "add_arch": True}),
+    "door": ("door", {"count": 2}),
+    "door_double_panels": ("door", {"count": 2, "double_door": True, "fill_type": "PANELS"}),
+    "door_panes_arch": ("door", {"count": 3, "fill_type": "GLASS_PANES", "add_arch": True}),
+    "multigroup": ("multigroup", {"count": 2, "components": "wdw"}),
+    "multigroup_panes_arch": ("multigroup", {"count": 2, "components": "dww", "fill_type": "GLASS_PANES", "add_arch": True}),
+}
+
+# -- the box the presets are built on, its side walls differ in width
+BOX = (12.0, 8.0, 4.0)
+
+
+def load_addon(path):
+    path = os.path.abspath(path)
+    sys.path.insert(0, os.path.dirname(path))
+    addon = importlib.import_module(os.path.basename(path))
+    addon.register()
+    return addon
+
+
+def make_box(name):
+    me = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_cube(bm, size=1.0)
+    for v in bm.verts:
+        v.co = [c * s for c, s in zip(v.co, BOX)]
+    bm.to_mesh(me)
+    bm.free()
+
+    obj = bpy.data.objects.new(name, me)
+    bpy.context.scene.collection.objects.link(obj)
+    bpy.context.view_layer.objects.active = obj
+    obj.select_set(True)
+    return obj
+
+
+def build(addon, name, builder, values):
+    """ Build the preset on the side walls of a new box, returns the box
+    """
+    module = importlib.import_module("{}.core.{}".format(addon.__name__, builder))
+    build_type = getattr(importlib.import_module(module.__name__ + "." + builder), builder.capitalize())
+    prop_type = getattr(importlib.import_module(module.__name__ + "." + builder + "_props"), builder.capitalize() + "Property")
+
+    obj = make_box(name)
+    bpy.ops.object.mode_set(mode="EDIT")
+    bm = bmesh.from_edit_mesh(obj.data)
+    for face in bm.faces:
+        face.select = not round(face.normal.z, 1)
+    bmesh.update_edit_mesh(obj.data)
+
+    bpy.types.Scene.compare_preset = bpy.props.PointerProperty(type=prop_type)
+    try:
+        prop = bpy.context.scene.compare_preset
+        prop.init(addon.utils.get_selected_face_dimensions(bpy.context))
+        for key, value in values.items():
+            setattr(prop, key, value)
+        prop.init(addon.utils.get_selected_face_dimensions(bpy.context))
+        result = build_type.build(bpy.context, prop)
+    finally:
+        del bpy.types.Scene.compare_preset
+    bpy.ops.object.mode_set(mode="OBJECT")
+    assert result == {"FINISHED"}, "{} was not built".format(name)
+    return obj
+
+
+def signature(obj):
+    """ Vertex and face counts and the sorted faces of the mesh of obj, each
+        as its rounded vertex coordinates, face map name and material index
+    """
+    me = obj.data
+    names = [fmap.name for fmap in obj.face_maps]
+    face_maps = [-1] * len(me.polygons)
+    if me.face_maps:
+        me.face_maps.active.data.foreach_get("value", face_maps)
+
+    faces = []
+    for poly, fmap in zip(me.polygons, face_maps):
+        coords = sorted([round(c, 4) for c in me.vertices[v].co] for v in poly.vertices)
+        faces.append([coords, names[fmap] if 0 <= fmap < len(names) else None, poly.material_index])
+    faces.sort(key=repr)
+    return {"vertices": len(me.vertices), "faces": len(me.polygons), "mesh": faces}
+
+
+def compare(name, before, after):
+    """ Differences between two signatures of one preset, as printable lines
+    """
+    lines = []
+    for key in ("vertices", "faces"):
+        if before[key] != after[key]:
+            lines.append("{}: {} {} -> {}".format(name, key, before[key], after[key]))
+    old = {repr(f) for f in before["mesh"]}
+    new = {repr(f) for f in after["mesh"]}
+    if old != new:
+        lines.append("{}: {} faces only before, {} only after".format(name, len(old - new), len(new - old)))
+    return lines
+
+
+def main():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--addon", default=ROOT, help="add-on directory the presets are built with")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--save", help="json file to save the signatures to")
+    group.add_argument("--compare", help="json file saved before to compare with")
+    args = parser.parse_args(argv)
+
+    addon = load_addon(args.addon)
+    signatures = {name: signature(build(addon, name, *preset)) for name, preset in PRESETS.items()}
+
+    if args.save:
+        with open(args.save, "w") as fp:
+            json.dump(signatures, fp)
+        print("saved {} presets to {}".format(len(signatures), args.save))
+        return
+
+    with open(args.compare) as fp:
+        saved = json.load(fp)
+    lines = [line for name in PRESETS for line in compare(name, saved[name], signatures[name])]
+    print("\n".join(lines) or "all {} presets match".format(len(PRESETS)))
+    sys.exit(1 if lines else 0)
+
+
+if __name__ == "__main__":
+    main()
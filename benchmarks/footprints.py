@@ -0,0 +1,126 @@
+""" Synthetic building footprints for the skeleton benchmarks.
+
+All footprints are returned in the clockwise order expected by skeletonize.
+"""
+
+import os
+import sys
+import math
+import random
+import importlib.util
+
+
+def load_skeleton(path=None, name="util_skeleton"):
+    """ Load utils/util_skeleton.py on its own, the addon package requires bpy.
+    path loads another copy of it under name instead
+    """
+    path = path or os.path.join(os.path.dirname(__file__), os.pardir, "utils", "util_skeleton.py")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # -- registered so that process pool workers can unpickle its functions
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def clockwise(points):
+    """ Reverse counter-clockwise points
+    """
+    return list(reversed(points))
+
+
+def star(n, outer=10.0, inner=6.0):
+    """ Regular star with n spikes (2n vertices)
+    """
+    points = []
+    for i in range(2 * n):
+        radius = outer if i % 2 == 0 else inner
+        angle = math.pi * i / n
+        points.append((radius * math.cos(angle), radius * math.sin(angle)))
+    return clockwise(points)
+
+
+def random_star(n, seed=0):
+    """ Star shaped polygon with n vertices at random angles and radii
+    """
+    rnd = random.Random(seed)
+    angles = sorted(rnd.uniform(0, 2 * math.pi) for _ in range(n))
+    points = []
+    for angle in angles:
+        radius = rnd.uniform(5.0, 10.0)
+        points.append((radius * math.cos(angle), radius * math.sin(angle)))
+    return clockwise(points)
+
+
+def rectangle(width=8.0, height=5.0):
+    """ Rectangular footprint
+    """
+    return clockwise([(0, 0), (width, 0), (width, height), (0, height)])
+
+
+def l_shape():
+    """ L shaped footprint
+    """
+    return clockwise([(0, 0), (6, 0), (6, 2), (2, 2), (2, 5), (0, 5)])
+
+
+def u_shape():
+    """ U shaped footprint
+    """
+    return clockwise([(0, 0), (6, 0), (6, 5), (4, 5), (4, 2), (2, 2), (2, 5), (0, 5)])
+
+
+def h_shape():
+    """ H shaped footprint
+    """
+    return clockwise(
+        [
+            (0, 0), (2, 0), (2, 2), (4, 2), (4, 0), (6, 0),
+            (6, 6), (4, 6), (4, 4), (2, 4), (2, 6), (0, 6),
+        ]
+    )
+
+
+def comb(teeth, width=1.0, gap=1.0, depth=5.0, base=2.0):
+    """ Comb with n teeth on a common base (4n vertices)
+    """
+    top = []
+    x = 0.0
+    for i in range(teeth):
+        top.append((x, base + depth))
+        top.append((x + width, base + depth))
+        if i < teeth - 1:
+            top.append((x + width, base))
+            top.append((x + width + gap, base))
+        x += width + gap
+    return clockwise([(0, 0), (x - gap, 0)] + list(reversed(top)))
+
+
+def random_orthogonal(n, seed=0):
+    """ Orthogonal skyline polygon with n random steps (2n + 2 vertices)
+    """
+    rnd = random.Random(seed)
+    x, top = 0.0, []
+    for _ in range(n):
+        height = rnd.uniform(2.0, 10.0)
+        width = rnd.uniform(0.5, 2.0)
+        top.extend([(x, height), (x + width, height)])
+        x += width
+    return clockwise([(0, 0), (x, 0)] + list(reversed(top)))
+
+
+def courtyards(n, size=2.0, gap=1.0, seed=0):
+    """ Square footprint with an n x n grid of courtyards as holes
+
+    Courtyards are jittered in size, a perfectly regular grid has too many
+    simultaneous events. Returns (polygon, holes), holes run counter-clockwise.
+    """
+    rnd = random.Random(seed)
+    extent = n * (size + gap) + gap
+    holes = []
+    for i in range(n):
+        for j in range(n):
+            x, y = gap + i * (size + gap), gap + j * (size + gap)
+            w, h = size * rnd.uniform(0.6, 1.0), size * rnd.uniform(0.6, 1.0)
+            holes.append([(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+    return rectangle(extent, extent), holes
@@ -0,0 +1,100 @@
+""" Test of the face map and material helpers, needs the blender python module.
+
+Skipped without bpy, or with a blender that no longer has face maps. Run it
+with a blender python that has pytest installed, from this directory.
+
+    cd benchmarks && python -m pytest test_material.py
+"""
+
+import os
+import sys
+import importlib
+
+import pytest
+
+bpy = pytest.importorskip("bpy")
+bmesh = pytest.importorskip("bmesh")
+if not hasattr(bpy.types, "FaceMap"):
+    pytest.skip("face maps were removed from this blender", allow_module_level=True)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(ROOT))
+addon = importlib.import_module(os.path.basename(ROOT))
+
+
+@pytest.fixture
+def registered():
+    addon.register()
+    yield
+    if bpy.context.object and bpy.context.object.mode != "OBJECT":
+        bpy.ops.object.mode_set(mode="OBJECT")
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj)
+    addon.unregister()
+
+
+def make_cube(name, maps, assignment):
+    """ Cube object with face maps called maps, face i in the face map at
+    assignment[i] (-1 for none)
+    """
+    me = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_cube(bm, size=1.0)
+    bm.to_mesh(me)
+    bm.free()
+
+    obj = bpy.data.objects.new(name, me)
+    bpy.context.scene.collection.objects.link(obj)
+    for fmap in maps:
+        obj.face_maps.new(name=fmap)
+        obj.facemap_materials.add()
+    for idx, fmap in enumerate(assignment):
+        if fmap >= 0:
+            obj.face_maps[fmap].add([idx])
+    return obj
+
+
+def face_maps_of(obj):
+    values = [0] * len(obj.data.polygons)
+    obj.data.face_maps.active.data.foreach_get("value", values)
+    return [fmap.name for fmap in obj.face_maps], values
+
+
+def test_clear_empty_facemaps_multi_object_edit(registered):
+    active = make_cube("active", ["a0", "a1", "a2"], [0, 0, 2, 2, -1, 2])
+    other = make_cube("other", ["b0", "b1", "b2", "b3"], [1, 1, 3, 3, 1, 1])
+
+    for obj in (active, other):
+        obj.select_set(True)
+    bpy.context.view_layer.objects.active = active
+    bpy.ops.object.mode_set(mode="EDIT")
+    assert active.mode == other.mode == "EDIT"
+
+    # -- the other object is not the edit object, its values must go to its own mesh
+    bpy.ops.btools.face_map_clear()
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    assert face_maps_of(active) == (["a0", "a2"], [0, 0, 1, 1, -1, 1])
+    assert face_maps_of(other) == (["b1", "b3"], [0, 0, 1, 1, 0, 0])
+
+
+@pytest.mark.parametrize("bulk_faces", [1, 10000])
+def test_set_materials_for_facemaps_edit_mode(registered, monkeypatch, bulk_faces):
+    from importlib import import_module
+    util_material = import_module(addon.__name__ + ".utils.util_material")
+    monkeypatch.setattr(util_material, "BULK_FACES", bulk_faces)
+
+    obj = make_cube("cube", ["m0", "m1"], [0, 0, 1, 1, -1, 1])
+    bpy.context.view_layer.objects.active = obj
+    bpy.ops.object.mode_set(mode="EDIT")
+
+    materials = {0: bpy.data.materials.new("mat0"), 1: bpy.data.materials.new("mat1")}
+    util_material.set_materials_for_facemaps(obj, materials)
+    # -- the bulk path goes through object mode and has to come back
+    assert obj.mode == "EDIT"
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    values = [0] * len(obj.data.polygons)
+    obj.data.polygons.foreach_get("material_index", values)
+    assert [m.name for m in obj.data.materials] == ["mat0", "mat1"]
+    assert values == [0, 0, 1, 1, 0, 1]
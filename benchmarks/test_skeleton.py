@@ -0,0 +1,290 @@
+""" Regression test for the straight skeleton.
+
+Checks the skeleton of every benchmark case against the signature stored in
+the baseline, and that the baseline still holds the skeletons of
+reference_skeleton.py, without timing anything. Also covers the rectilinear
+solver, the flat array and face output, the rectangle gable and the skeleton
+cache. Run it from this directory, the addon package above it requires bpy.
+
+    cd benchmarks && python -m pytest test_skeleton.py
+"""
+
+import json
+import math
+
+import pytest
+
+import footprints as fp
+import bench_skeleton as bench
+
+sk = bench.sk
+
+MAX_VERTICES = 1000
+
+# -- the reference skeleton takes ~20s on the 1000 vertex cases
+REFERENCE_MAX_VERTICES = 500
+
+# -- skeletonize leaves arcs crossing on these, skeleton_faces rejects them
+DEGENERATE = {"courtyards_4", "courtyards_10"}
+
+with open(bench.BASELINE) as f:
+    BASELINES = json.load(f)
+
+
+def signature_cases():
+    """ (factory, signature) for each case with a stored signature
+    """
+    params = []
+    for name, factory in bench.cases():
+        baseline = BASELINES.get(name)
+        if baseline and baseline["vertices"] <= MAX_VERTICES:
+            params.append(pytest.param(factory, baseline["signature"], id=name))
+    return params
+
+
+@pytest.mark.parametrize("factory, expected", signature_cases())
+def test_signature(factory, expected):
+    polygon, holes = factory()
+    assert bench.signature(bench.sk.skeletonize(polygon, holes)) == expected
+
+
+@pytest.fixture(scope="module")
+def reference():
+    return bench.load_reference()
+
+
+@pytest.mark.parametrize("factory, expected", [
+    p for p in signature_cases() if BASELINES[p.id]["vertices"] <= REFERENCE_MAX_VERTICES
+])
+def test_baseline_matches_reference(reference, factory, expected):
+    polygon, holes = factory()
+    assert bench.signature(reference.skeletonize(polygon, holes)) == expected
+
+
+def rectilinear_cases():
+    params = []
+    for name, factory in bench.cases():
+        polygon, holes = factory()
+        size = len(polygon) + sum(len(h) for h in holes)
+        if size <= MAX_VERTICES and all(sk.is_rectilinear(c) for c in [polygon] + holes):
+            params.append(pytest.param(polygon, holes, name in DEGENERATE, id=name))
+    return params
+
+
+def roof_faces(skeleton, polygon, holes):
+    """ The roof faces of skeleton as lists of (x, y, height), contour edge first
+    """
+    arrays = sk.skeleton_arrays(skeleton, polygon, holes)
+    return [
+        [(arrays.x[n], arrays.y[n], arrays.height[n]) for n in face]
+        for face in sk.skeleton_faces(arrays, polygon, holes)
+    ]
+
+
+def distance_to_edge(face, x, y):
+    """ Distance from (x, y) to the line through the contour edge of face
+    """
+    (ax, ay, _), (bx, by, _) = face[:2]
+    return abs((x - ax) * (by - ay) - (y - ay) * (bx - ax)) / math.hypot(bx - ax, by - ay)
+
+
+def contains(face, x, y):
+    inside = False
+    for (ax, ay, _), (bx, by, _) in zip(face, face[1:] + face[:1]):
+        if (ay > y) != (by > y) and x < ax + (y - ay) * (bx - ax) / (by - ay):
+            inside = not inside
+    return inside
+
+
+def roof_height(faces, x, y):
+    """ Height of the roof at (x, y), None outside of it
+    """
+    for face in faces:
+        xs = [p[0] for p in face]
+        ys = [p[1] for p in face]
+        if min(xs) <= x <= max(xs) and min(ys) <= y <= max(ys) and contains(face, x, y):
+            return distance_to_edge(face, x, y)
+    return None
+
+
+def area(points):
+    return sum(
+        ax * by - bx * ay for (ax, ay, *_), (bx, by, *_) in zip(points, points[1:] + points[:1])
+    ) / 2
+
+
+def assert_valid_roof(faces, polygon, holes):
+    """ Every node lies as high as it is far from the edge of its face and the
+    faces cover the polygon
+    """
+    for face in faces:
+        for x, y, height in face:
+            assert distance_to_edge(face, x, y) == pytest.approx(height, abs=1e-5)
+    covered = sum(abs(area(face)) for face in faces)
+    expected = abs(area(polygon)) - sum(abs(area(hole)) for hole in holes)
+    assert covered == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("polygon, holes, degenerate", rectilinear_cases())
+def test_rectilinear_matches_skeletonize(polygon, holes, degenerate):
+    """ Both solvers give the same roof. Where edges are equally far apart,
+    as between the teeth of a comb, they split the roof into faces
+    differently, so the skeletons themselves are not compared
+    """
+    faces = roof_faces(sk.skeletonize_rectilinear(polygon, holes), polygon, holes)
+    assert_valid_roof(faces, polygon, holes)
+
+    skeleton = sk.skeletonize(polygon, holes)
+    if degenerate:
+        with pytest.raises(ValueError):
+            roof_faces(skeleton, polygon, holes)
+        return
+    expected = roof_faces(skeleton, polygon, holes)
+
+    xs = [x for x, _ in polygon]
+    ys = [y for _, y in polygon]
+    for i in range(23):
+        for j in range(17):
+            x = min(xs) + (max(xs) - min(xs)) * (i + 0.37) / 23
+            y = min(ys) + (max(ys) - min(ys)) * (j + 0.61) / 17
+            height = roof_height(expected, x, y)
+            if height is None:
+                assert roof_height(faces, x, y) is None
+            else:
+                assert roof_height(faces, x, y) == pytest.approx(height, abs=1e-5)
+
+
+def test_skeleton_arrays():
+    polygon = fp.rectangle()
+    arrays = sk.skeleton_arrays(sk.skeletonize(polygon, []), polygon)
+
+    # -- the polygon comes first, then the two ends of the ridge
+    assert list(zip(arrays.x, arrays.y))[:4] == polygon
+    assert sorted(zip(arrays.x[4:], arrays.y[4:])) == [(2.5, 2.5), (5.5, 2.5)]
+    assert list(arrays.height) == [0.0] * 4 + [2.5] * 2
+    pairs = sorted(zip(arrays.edges[::2], arrays.edges[1::2]))
+    assert len(pairs) == 5 and all(a < b for a, b in pairs)
+    assert (4, 5) in pairs
+
+
+def test_skeleton_faces():
+    polygon = fp.rectangle()
+    arrays = sk.skeleton_arrays(sk.skeletonize(polygon, []), polygon)
+    faces = sk.skeleton_faces(arrays, polygon)
+
+    # -- one face per contour edge, starting with it
+    ring = list(range(4))
+    contour = set(zip(ring, ring[1:] + ring[:1])) | set(zip(ring[1:] + ring[:1], ring))
+    assert {tuple(face[:2]) for face in faces} <= contour
+    assert len({frozenset(face[:2]) for face in faces}) == 4
+    assert sorted(len(face) for face in faces) == [3, 3, 4, 4]
+
+
+def test_skeleton_faces_rejects_degenerate():
+    polygon, holes = fp.courtyards(4)
+    arrays = sk.skeleton_arrays(sk.skeletonize(polygon, holes), polygon, holes)
+    with pytest.raises(ValueError):
+        sk.skeleton_faces(arrays, polygon, holes)
+
+
+@pytest.mark.parametrize("flip, ridge, height", [
+    (False, [(4.0, 0.0), (4.0, 5.0)], 4.0),
+    (True, [(0.0, 2.5), (8.0, 2.5)], 2.5),
+])
+def test_rectangle_gable_ridge(flip, ridge, height):
+    # -- gable ends on the long sides, the ridge spans the short way unless flipped
+    polygon = fp.rectangle(8.0, 5.0)
+    for start in range(4):
+        (xs, ys, heights), polygons, walls = sk.rectangle_gable_faces(polygon[start:] + polygon[:start], flip)
+        assert sorted(zip(xs[4:], ys[4:])) == ridge
+        assert heights[4:] == [height, height]
+        assert all(len(polygons[i]) == 3 for i in walls)
+
+
+def test_cache_key_ignores_start_vertex():
+    cache = sk.SkeletonCache()
+    polygon = fp.l_shape()
+    assert cache.key(polygon) == cache.key(polygon[2:] + polygon[:2])
+    assert cache.key(polygon) == cache.key([(x + 1e-8, y) for x, y in polygon])
+    assert cache.key(polygon) != cache.key(fp.u_shape())
+
+
+def test_cache_lru():
+    cache = sk.SkeletonCache(maxsize=2)
+    l_shape, u_shape, h_shape = fp.l_shape(), fp.u_shape(), fp.h_shape()
+
+    first = cache.skeletonize(l_shape)
+    cache.skeletonize(u_shape)
+    assert cache.skeletonize(l_shape[1:] + l_shape[:1]) is first
+    # -- u_shape is the least recently used
+    cache.skeletonize(h_shape)
+    assert cache.skeletonize(l_shape) is first
+    cache.skeletonize(u_shape)
+    assert cache.info() == sk.CacheInfo(hits=2, misses=4, maxsize=2, currsize=2)
+
+
+def test_cache_results_are_frozen():
+    cache = sk.SkeletonCache()
+    skeleton = cache.skeletonize(fp.star(5))
+    assert isinstance(skeleton, tuple)
+    assert all(isinstance(arc.sinks, tuple) for arc in skeleton)
+    assert bench.signature(skeleton) == bench.signature(sk.skeletonize(fp.star(5), []))
+
+
+def test_cache_skeletonize_many():
+    cache = sk.SkeletonCache()
+    l_shape, star = fp.l_shape(), fp.star(5)
+    results = cache.skeletonize_many([l_shape, star, l_shape[3:] + l_shape[:3]])
+
+    assert cache.info() == sk.CacheInfo(hits=1, misses=2, maxsize=32, currsize=2)
+    assert results[0] is results[2]
+    assert [bench.signature(r) for r in results[:2]] == [
+        bench.signature(sk.skeletonize(p, [])) for p in (l_shape, star)
+    ]
+
+
+def test_cache_passes_max_workers(monkeypatch):
+    calls = []
+
+    def skeletonize_many(polygons, holes=None, max_workers=None):
+        calls.append(max_workers)
+        return [sk.skeletonize_footprint(p, h) for p, h in zip(polygons, holes)]
+
+    monkeypatch.setattr(sk, "skeletonize_many", skeletonize_many)
+    sk.SkeletonCache().skeletonize_many([fp.l_shape()], max_workers=4)
+    assert calls == [4]
+
+
+def test_footprint_uses_rectilinear_solver(monkeypatch):
+    polygon = fp.h_shape()
+    expected = bench.signature(sk.skeletonize_rectilinear(polygon))
+
+    def fail(*args):
+        raise AssertionError("skeletonize called")
+
+    monkeypatch.setattr(sk, "skeletonize", fail)
+    assert bench.signature(sk.skeletonize_footprint(polygon)) == expected
+
+
+def test_footprint_falls_back_to_skeletonize(monkeypatch):
+    polygon = fp.h_shape()
+    expected = bench.signature(sk.skeletonize(polygon, []))
+
+    def fail(*args):
+        raise ValueError("unsupported")
+
+    monkeypatch.setattr(sk, "skeletonize_rectilinear", fail)
+    assert bench.signature(sk.skeletonize_footprint(polygon)) == expected
+
+
+MANY = [fp.star(5), fp.rectangle(), fp.random_star(30), fp.l_shape(), fp.star(7)]
+
+
+@pytest.mark.parametrize("max_workers", [None, 2])
+def test_skeletonize_many_keeps_input_order(monkeypatch, max_workers):
+    # -- small enough to go through the pool as well
+    monkeypatch.setattr(sk, "PARALLEL_THRESHOLD", 0)
+    results = sk.skeletonize_many(MANY, max_workers=max_workers)
+    assert [bench.signature(r) for r in results] == [
+        bench.signature(sk.skeletonize_footprint(p)) for p in MANY
+    ]
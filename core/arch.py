@@ -1,64 +1,71 @@
 import bmesh
-from bmesh.types import BMEdge
 from ..utils import (
     add_facemap_for_groups,
     sort_verts,
-    filter_geom,
     map_new_faces,
     FaceMap,
-    arc_edge,
+    arc_edges,
+    MeshRegion,
     get_bottom_faces,
     extrude_face_region,
 )
 
 
-def fill_arch(bm, face, prop):
-    """ Fill arch
+def fill_arch(bm, faces, prop):
+    """ Fill arch faces
     """
     if prop.fill_type == "GLASS_PANES":
         add_facemap_for_groups(FaceMap.DOOR_PANES)
-        pane_arch_face(bm, face, prop.glass_fill)
+        pane_arch_faces(bm, faces, prop.glass_fill)
 
 
-def create_arch(bm, top_edges, frame_faces, arch_prop, frame_thickness, xyz):
-    """ Create arch using top edges of extreme frames
+def create_arches(bm, top_edges, arch_prop, frame_thickness, xyz):
+    """ Create an arch for each opening using the top edges of its extreme
+        frames, returns the arch face and arch frame faces of each
+
+        The arcs of all openings are cut together, upper and lower arcs in
+        separate passes since the arcs of one arch border the same face
     """
-    verts = sort_verts([v for e in top_edges for v in e.verts], xyz[0])
-    arc_edges = [
-        bmesh.ops.connect_verts(bm, verts=[verts[0], verts[-1]])['edges'].pop(),
-        bmesh.ops.connect_verts(bm, verts=[verts[1], verts[-2]])['edges'].pop(),
+    verts = [sort_verts([v for e in edges for v in e.verts], xyz[0]) for edges in top_edges]
+    chords = [
+        (
+            bmesh.ops.connect_verts(bm, verts=[vs[0], vs[-1]])['edges'].pop(),
+            bmesh.ops.connect_verts(bm, verts=[vs[1], vs[-2]])['edges'].pop(),
+        )
+        for vs in verts
     ]
+    MeshRegion.record([e for chord in chords for e in chord])
 
-    upper_arc = filter_geom(arc_edge(bm, arc_edges[0], arch_prop.resolution, arch_prop.height, arch_prop.depth, xyz, arch_prop.function)["geom_split"], BMEdge)
-    lower_arc = filter_geom(arc_edge(bm, arc_edges[1], arch_prop.resolution, arch_prop.height-frame_thickness, arch_prop.depth, xyz, arch_prop.function)["geom_split"], BMEdge)
-    arc_edges = [
-        *upper_arc,
-        *lower_arc,
-    ]
+    upper_arcs = arc_edges(bm, [upper for upper, _ in chords], arch_prop.resolution, arch_prop.height, xyz, arch_prop.function)
+    lower_arcs = arc_edges(bm, [lower for _, lower in chords], arch_prop.resolution, arch_prop.height-frame_thickness, xyz, arch_prop.function)
 
-    arc_face = min(upper_arc[arch_prop.resolution//2].link_faces, key=lambda f: f.calc_center_median().z)
-    bmesh.ops.delete(bm, geom=[arc_face], context="FACES")
+    arc_faces = [min(upper_arc[arch_prop.resolution//2].link_faces, key=lambda f: f.calc_center_median().z) for upper_arc in upper_arcs]
+    bmesh.ops.delete(bm, geom=arc_faces, context="FACES")
 
-    arch_frame_faces = bmesh.ops.bridge_loops(bm, edges=arc_edges)["faces"]
-    arch_face = min(lower_arc[arch_prop.resolution//2].link_faces, key=lambda f: f.calc_center_median().z)
+    arches = []
+    for vs, upper_arc, lower_arc in zip(verts, upper_arcs, lower_arcs):
+        arch_frame_faces = MeshRegion.record(bmesh.ops.bridge_loops(bm, edges=upper_arc + lower_arc))["faces"]
+        arch_face = min(lower_arc[arch_prop.resolution//2].link_faces, key=lambda f: f.calc_center_median().z)
 
-    if len(verts) == 4: # corner case
-        verts = sort_verts([v for e in top_edges for v in e.verts], xyz[0])
-        new_edge = bmesh.ops.connect_verts(bm, verts=[verts[1], verts[-2]])['edges'].pop()
-        new_face = get_bottom_faces(new_edge.link_faces).pop()
-        arch_frame_faces.append(new_face)
+        if len(vs) == 4: # corner case
+            new_edge = bmesh.ops.connect_verts(bm, verts=[vs[1], vs[-2]])['edges'].pop()
+            MeshRegion.record([new_edge])
+            new_face = get_bottom_faces(new_edge.link_faces).pop()
+            arch_frame_faces.append(new_face)
 
-    return arch_face, arch_frame_faces
+        arches.append((arch_face, arch_frame_faces))
+    return arches
 
 
 @map_new_faces(FaceMap.DOOR_PANES)
-def pane_arch_face(bm, face, prop):
-    bmesh.ops.inset_individual(
-        bm, faces=[face], thickness=prop.pane_margin * 0.75, use_even_offset=True
-    )
-    bmesh.ops.translate(
-        bm, verts=face.verts, vec=-face.normal * prop.pane_depth
-    )
+def pane_arch_faces(bm, faces, prop):
+    MeshRegion.record(bmesh.ops.inset_individual(
+        bm, faces=faces, thickness=prop.pane_margin * 0.75, use_even_offset=True
+    ))
+    for face in faces:
+        bmesh.ops.translate(
+            bm, verts=face.verts, vec=-face.normal * prop.pane_depth
+        )
 
 
 def add_arch_depth(bm, arch_face, depth, normal):
@@ -1,22 +1,20 @@
-import bmesh
-
 from .balcony_types import create_balcony
-from ...utils import get_edit_mesh, FaceMap, add_facemap_for_groups, verify_facemaps_for_object
+from ...utils import FaceMap, EditMeshSession, add_facemap_for_groups, verify_facemaps_for_object
 
 
 class Balcony:
     @classmethod
     def build(cls, context, prop):
-        verify_facemaps_for_object(context.object)
-        me = get_edit_mesh()
-        bm = bmesh.from_edit_mesh(me)
-        faces = [face for face in bm.faces if face.select]
+        with EditMeshSession.open(context) as session:
+            verify_facemaps_for_object(context.object)
+            bm = session.bm
+            faces = [face for face in bm.faces if face.select]
 
-        if cls.validate(faces):
-            cls.add_balcony_facemaps()
-            create_balcony(bm, faces, prop)
-            bmesh.update_edit_mesh(me, True)
-            return {"FINISHED"}
+            if cls.validate(faces):
+                cls.add_balcony_facemaps()
+                create_balcony(bm, faces, prop)
+                session.modified = True
+                return {"FINISHED"}
         return {"CANCELLED"}
 
     @classmethod
@@ -1,16 +1,16 @@
-import bmesh
 from ..generic import clamp_count
 from ..frame import add_frame_depth
 from ..fill import fill_panel, fill_glass_panes, fill_louver, FillUser
 
 from ..arch import (
     fill_arch,
-    create_arch,
+    create_arches,
     add_arch_depth,
 )
 from ...utils import (
     FaceMap,
     local_xyz,
+    MeshRegion,
     valid_ngon,
     popup_message,
     map_new_faces,
@@ -18,11 +18,13 @@ from ...utils import (
     get_top_faces,
     get_bottom_faces,
     add_faces_to_map,
+    group_faces_by_size,
     extrude_face_region,
     calc_face_dimensions,
     add_facemap_for_groups,
-    subdivide_face_vertically,
+    subdivide_faces_vertically,
     subdivide_face_horizontally,
+    subdivide_faces_horizontally,
 )
 
 
@@ -36,48 +38,62 @@ def create_door(bm, faces, prop):
 
         face.select = False
         clamp_count(calc_face_dimensions(face)[0], prop.frame_thickness * 2, prop)
-        array_faces = subdivide_face_horizontally(bm, face, widths=[prop.size_offset.size.x]*prop.count)
-        for aface in array_faces:
-            face = create_door_split(bm, aface, prop.size_offset.size, prop.size_offset.offset)
-            door, arch = create_door_frame(bm, face, prop)
-            create_door_fill(bm, door, prop)
-            if prop.add_arch:
-                fill_arch(bm, arch, prop)
+        openings = create_door_split(bm, face, prop.count, prop.size_offset.size, prop.size_offset.offset)
+        insets = make_door_inset(bm, openings, prop.size_offset.size, prop.frame_thickness)
+        arches = [(None, [])] * len(insets)
+        if prop.add_arch:
+            arches = create_door_arches(bm, insets, prop)
+
+        doors, arch_faces = [], []
+        for (door_face, frame_faces), arch in zip(insets, arches):
+            door, arch_face = create_door_frame(bm, door_face, frame_faces, arch, prop)
+            doors.append(door)
+            arch_faces.append(arch_face)
+
+        create_door_fill(bm, doors, prop)
+        if prop.add_arch:
+            fill_arch(bm, arch_faces, prop)
     return True
 
 
 @map_new_faces(FaceMap.WALLS)
-def create_door_split(bm, face, size, offset):
-    """Use properties from SizeOffset to subdivide face into regular quads
+def create_door_split(bm, face, count, size, offset):
+    """Use properties from SizeOffset to subdivide face into regular quads,
+       one door opening for each of count array items
     """
 
     wall_w, wall_h = calc_face_dimensions(face)
-    # horizontal split
-    h_widths = [wall_w/2 + offset.x - size.x/2, size.x, wall_w/2 - offset.x - size.x/2]
+    array_w = wall_w / count
+    # horizontal split, for all array items at once
+    h_widths = [array_w/2 + offset.x - size.x/2, size.x, array_w/2 - offset.x - size.x/2] * count
     h_faces = subdivide_face_horizontally(bm, face, h_widths)
     # vertical split
     v_width = [wall_h/2 + offset.y + size.y/2, wall_h/2 - offset.y - size.y/2]
-    v_faces = subdivide_face_vertically(bm, h_faces[1], v_width)
+    v_faces = subdivide_faces_vertically(bm, h_faces[1::3], v_width)
 
-    return v_faces[0]
+    return [f[0] for f in v_faces]
 
 
-def create_door_frame(bm, face, prop):
-    """Extrude and inset face to make door frame
+def create_door_arches(bm, insets, prop):
+    """Create the arches of all inset doors, returns the arch face and arch
+       frame faces of each
     """
-    normal = face.normal.copy()
+    top_edges = []
+    for door_face, frame_faces in insets:
+        frame_faces.remove(get_top_faces(frame_faces).pop()) # remove top face from frame_faces
+        top_edges.append(get_top_edges({e for f in get_bottom_faces(frame_faces, n=2) for e in f.edges}, n=2))
+    return create_arches(bm, top_edges, prop.arch, prop.frame_thickness, local_xyz(insets[0][0]))
 
-    door_face, frame_faces = make_door_inset(bm, face, prop.size_offset.size, prop.frame_thickness)
-    arch_face = None
 
-    # create arch
-    if prop.add_arch:
-        frame_faces.remove(get_top_faces(frame_faces).pop()) # remove top face from frame_faces
-        top_edges = get_top_edges({e for f in get_bottom_faces(frame_faces, n=2) for e in f.edges}, n=2)
-        arch_face, arch_frame_faces = create_arch(bm, top_edges, frame_faces, prop.arch, prop.frame_thickness, local_xyz(face))
-        frame_faces += arch_frame_faces
+def create_door_frame(bm, door_face, frame_faces, arch, prop):
+    """Extrude around the inset door face to make door frame, arch is the
+       arch face and arch frame faces from create_door_arches
+    """
+    normal = door_face.normal.copy()
+    arch_face, arch_frame_faces = arch
+    frame_faces += arch_frame_faces
 
-    bmesh.ops.recalc_face_normals(bm, faces=list(bm.faces))
+    MeshRegion(bm, [door_face, arch_face] + frame_faces).recalc_face_normals()
 
     # add depths
     if prop.add_arch:
@@ -107,41 +123,45 @@ def add_door_depth(bm, door, depth, normal):
         return door, []
 
 
-def create_door_fill(bm, face, prop):
-    """Add decorative elements on door face
+def create_door_fill(bm, faces, prop):
+    """Add decorative elements on door faces
     """
     if prop.double_door:
-        faces = subdivide_face_horizontally(bm, face, widths=[1, 1])
-        for f in faces:
-            fill_door_face(bm, f, prop)
-    else:
-        fill_door_face(bm, face, prop)
+        faces = [f for halves in subdivide_faces_horizontally(bm, faces, widths=[1, 1]) for f in halves]
+    fill_door_faces(bm, faces, prop)
 
 
-def fill_door_face(bm, face, prop):
-    """ Fill individual door face
+def fill_door_faces(bm, faces, prop):
+    """ Fill individual door faces
     """
     if prop.fill_type == "PANELS":
         add_facemap_for_groups(FaceMap.DOOR_PANELS)
-        fill_panel(bm, face, prop.panel_fill)
+        for face in faces:
+            fill_panel(bm, face, prop.panel_fill)
     elif prop.fill_type == "GLASS_PANES":
         add_facemap_for_groups(FaceMap.DOOR_PANES)
-        fill_glass_panes(bm, face, prop.glass_fill, user=FillUser.DOOR)
+        fill_glass_panes(bm, faces, prop.glass_fill, user=FillUser.DOOR)
     elif prop.fill_type == "LOUVER":
         add_facemap_for_groups(FaceMap.DOOR_LOUVERS)
-        fill_louver(bm, face, prop.louver_fill, user=FillUser.DOOR)
+        for face in faces:
+            fill_louver(bm, face, prop.louver_fill, user=FillUser.DOOR)
 
 
-def make_door_inset(bm, face, size, frame_thickness):
-    """ Make one horizontal cut and two vertical cuts on face
+def make_door_inset(bm, faces, size, frame_thickness):
+    """ Make one horizontal cut and two vertical cuts on each face, returns
+        the door face and frame faces of each. Faces of the same size are cut
+        together
     """
     door_width = size.x - frame_thickness * 2
-    _, face_height = calc_face_dimensions(face)
-    door_height = face_height - frame_thickness
+    groups = group_faces_by_size(faces)
     # horizontal cuts
     h_widths = [frame_thickness, door_width, frame_thickness]
-    h_faces = subdivide_face_horizontally(bm, face, h_widths)
-    # vertical cuts
-    v_widths = [door_height, frame_thickness]
-    v_faces = subdivide_face_vertically(bm, h_faces[1], v_widths)
-    return v_faces[0], h_faces[::2] + [v_faces[1]]
+    h_faces = subdivide_faces_horizontally(bm, faces, h_widths)
+    # vertical cuts, the door height follows the height of each face
+    insets = [None] * len(faces)
+    for (_, face_height), indices in groups.items():
+        v_widths = [face_height - frame_thickness, frame_thickness]
+        v_faces = subdivide_faces_vertically(bm, [h_faces[idx][1] for idx in indices], v_widths)
+        for idx, v in zip(indices, v_faces):
+            insets[idx] = (v[0], h_faces[idx][::2] + [v[1]])
+    return insets
@@ -5,6 +5,7 @@ from bmesh.types import BMEdge, BMVert
 from ...utils import (
     FaceMap,
     validate,
+    MeshRegion,
     filter_geom,
     map_new_faces,
     add_faces_to_map,
@@ -27,9 +28,9 @@ def fill_panel(bm, face, prop):
     if prop.panel_count_x + prop.panel_count_y == 0:
         return
 
-    bmesh.ops.inset_individual(bm, faces=[face], thickness=prop.panel_border_size)
-    quads = subdivide_face_into_quads(bm, face, prop.panel_count_x, prop.panel_count_y)
-    bmesh.ops.inset_individual(bm, faces=quads, thickness=prop.panel_margin / 2)
+    MeshRegion.record(bmesh.ops.inset_individual(bm, faces=[face], thickness=prop.panel_border_size))
+    quads = subdivide_faces_into_quads(bm, [face], prop.panel_count_x, prop.panel_count_y)
+    MeshRegion.record(bmesh.ops.inset_individual(bm, faces=quads, thickness=prop.panel_margin / 2))
     bmesh.ops.translate(
         bm,
         verts=list({v for f in quads for v in f.verts}),
@@ -38,15 +39,15 @@ def fill_panel(bm, face, prop):
     add_faces_to_map(bm, quads, FaceMap.DOOR_PANELS)
 
 
-def fill_glass_panes(bm, face, prop, user=FillUser.DOOR):
-    """Create glass panes on face
+def fill_glass_panes(bm, faces, prop, user=FillUser.DOOR):
+    """Create glass panes on faces, the pane grids of all faces are cut together
     """
-    if prop.pane_count_x + prop.pane_count_y == 0:
+    if prop.pane_count_x + prop.pane_count_y == 0 or not faces:
         return
 
     userframe = FaceMap.DOOR_PANES if user == FillUser.DOOR else FaceMap.WINDOW_PANES
-    bmesh.ops.inset_individual(bm, faces=[face], thickness=0.0001) # to isolate the working quad and not leave adjacent face as n-gon
-    quads = subdivide_face_into_quads(bm, face, prop.pane_count_x, prop.pane_count_y)
+    MeshRegion.record(bmesh.ops.inset_individual(bm, faces=faces, thickness=0.0001)) # to isolate the working quads and not leave adjacent faces as n-gons
+    quads = subdivide_faces_into_quads(bm, faces, prop.pane_count_x, prop.pane_count_y)
 
     inset = map_new_faces(userframe)(bmesh.ops.inset_individual)
     inset(bm, faces=quads, thickness=prop.pane_margin, depth=-prop.pane_depth)
@@ -117,28 +118,34 @@ def fill_louver(bm, face, prop, user=FillUser.DOOR):
     add_faces_to_map(bm, validate(faces[::2]), usergroup)
 
 
-def subdivide_face_into_quads(bm, face, cuts_x, cuts_y):
-    """subdivide a face(quad) into more quads
+def subdivide_faces_into_quads(bm, faces, cuts_x, cuts_y):
+    """subdivide faces(quads) into more quads, one subdivide for all faces in each direction
     """
-    v_edges = filter_vertical_edges(face.edges, face.normal)
-    h_edges = filter_horizontal_edges(face.edges, face.normal)
+    v_edges = list({e for f in faces for e in filter_vertical_edges(f.edges, f.normal)})
+    h_edges = list({e for f in faces for e in filter_horizontal_edges(f.edges, f.normal)})
 
     edges = []
-    if cuts_x > 0:
-        res = bmesh.ops.subdivide_edges(bm, edges=v_edges, cuts=cuts_x)
-        edges.extend(filter_geom(res["geom_inner"], BMEdge))
-
-    if cuts_y > 0:
-        res = bmesh.ops.subdivide_edges(bm, edges=h_edges + edges, cuts=cuts_y)
-        edges.extend(filter_geom(res["geom_inner"], BMEdge))
-    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.01)
-    return list({f for ed in validate(edges) for f in ed.link_faces})
+    with MeshRegion(bm) as region:
+        if cuts_x > 0:
+            res = bmesh.ops.subdivide_edges(bm, edges=v_edges, cuts=cuts_x)
+            MeshRegion.record(res["geom_inner"] + res["geom_split"])
+            edges.extend(filter_geom(res["geom_inner"], BMEdge))
+
+        if cuts_y > 0:
+            res = bmesh.ops.subdivide_edges(bm, edges=h_edges + edges, cuts=cuts_y)
+            MeshRegion.record(res["geom_inner"] + res["geom_split"])
+            edges.extend(filter_geom(res["geom_inner"], BMEdge))
+    region.remove_doubles(dist=0.01)
+    quads = list({f for ed in validate(edges) for f in ed.link_faces})
+    MeshRegion.record(set(quads) - set(faces))
+    return quads
 
 
 def duplicate_face_translate_scale(bm, face, position, scale, scale_center):
     """Duplicate a face and transform it
     """
     ret = bmesh.ops.duplicate(bm, geom=[face])
+    MeshRegion.record(ret["geom"])
     verts = filter_geom(ret["geom"], BMVert)
 
     bmesh.ops.scale(bm, verts=verts, vec=scale, space=Matrix.Translation(-scale_center))
@@ -149,7 +156,7 @@ def duplicate_face_translate_scale(bm, face, position, scale, scale_center):
 def extrude_edges_to_depth(bm, edges, depth):
     """Extrude edges only and translate
     """
-    ext = bmesh.ops.extrude_edge_only(bm, edges=edges)
+    ext = MeshRegion.record(bmesh.ops.extrude_edge_only(bm, edges=edges))
     bmesh.ops.translate(bm, verts=filter_geom(ext["geom"], BMVert), vec=depth)
 
 
@@ -157,6 +164,7 @@ def extrude_faces_add_slope(bm, faces, extrude_normal, extrude_depth):
     """Extrude faces and move top edge back to form a wedge
     """
     res = bmesh.ops.extrude_discrete_faces(bm, faces=faces)
+    MeshRegion.record({f for face in res["faces"] for e in face.edges for f in e.link_faces})
     bmesh.ops.translate(
         bm,
         vec=extrude_normal * extrude_depth,
@@ -176,9 +184,12 @@ def subdivide_face_into_vertical_segments(bm, face, segments):
     """
     res = bmesh.ops.subdivide_edges(
         bm, edges=filter_vertical_edges(face.edges, face.normal), cuts=segments
-    ).get("geom_inner")
+    )
+    MeshRegion.record(res["geom_inner"] + res["geom_split"])
 
-    return list({f for e in filter_geom(res, BMEdge) for f in e.link_faces})
+    faces = list({f for e in filter_geom(res["geom_inner"], BMEdge) for f in e.link_faces})
+    MeshRegion.record([f for f in faces if f is not face])
+    return faces
 
 
 def double_and_make_even(value):
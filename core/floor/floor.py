@@ -1,10 +1,9 @@
-import bmesh
 from .floor_types import create_floors
 
 from ...utils import (
     select,
     FaceMap,
-    get_edit_mesh,
+    EditMeshSession,
     add_facemap_for_groups,
     verify_facemaps_for_object,
 )
@@ -13,23 +12,23 @@ from ...utils import (
 class Floor:
     @classmethod
     def build(cls, context, prop):
-        verify_facemaps_for_object(context.object)
-        context.object.tracked_properties.slab_outset = prop.slab_outset
+        with EditMeshSession.open(context) as session:
+            verify_facemaps_for_object(context.object)
+            context.object.tracked_properties.slab_outset = prop.slab_outset
 
-        me = get_edit_mesh()
-        bm = bmesh.from_edit_mesh(me)
+            bm = session.bm
 
-        if cls.validate(bm):
-            cls.add_floor_facemaps()
-            selected_faces = [f for f in bm.faces if f.select]
-            if selected_faces:
-                create_floors(bm, selected_faces, prop)
-                select(bm.faces, False)
-            else:
-                all_faces = [f for f in bm.faces]
-                create_floors(bm, all_faces, prop)
-            bmesh.update_edit_mesh(me, True)
-            return {"FINISHED"}
+            if cls.validate(bm):
+                cls.add_floor_facemaps()
+                selected_faces = [f for f in bm.faces if f.select]
+                if selected_faces:
+                    create_floors(bm, selected_faces, prop)
+                    select(bm.faces, False)
+                else:
+                    all_faces = [f for f in bm.faces]
+                    create_floors(bm, all_faces, prop)
+                session.modified = True
+                return {"FINISHED"}
         return {"CANCELLED"}
 
     @classmethod
@@ -4,6 +4,7 @@ from bmesh.types import BMFace
 from ...utils import (
     equal,
     FaceMap,
+    MeshRegion,
     filter_geom,
     closest_faces,
     add_faces_to_map,
@@ -18,7 +19,7 @@ def create_floors(bm, faces, prop):
     """
     slabs, walls, roof = extrude_slabs_and_floors(bm, faces, prop)
 
-    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+    MeshRegion(bm, slabs + walls + roof).recalc_face_normals()
 
     add_faces_to_map(bm, slabs, FaceMap.SLABS)
     add_faces_to_map(bm, walls, FaceMap.WALLS)
@@ -1,5 +1,4 @@
 import bpy
-import bmesh
 from bpy.props import (
     IntProperty,
     EnumProperty,
@@ -12,9 +11,10 @@ from bpy.props import (
 
 from ..utils import (
     clamp,
-    get_edit_mesh,
     restricted_size,
     restricted_offset,
+    clear_empty_facemaps,
+    set_materials_for_facemaps,
     set_material_for_active_facemap,
 )
 
@@ -183,7 +183,7 @@ class BTOOLS_UL_fmaps(bpy.types.UIList):
 
 
 class BTOOLS_OT_fmaps_clear(bpy.types.Operator):
-    """Remove all empty face maps"""
+    """Remove all empty face maps of the active and selected objects"""
 
     bl_idname = "btools.face_map_clear"
     bl_label = "Clear empty face maps"
@@ -195,25 +195,27 @@ class BTOOLS_OT_fmaps_clear(bpy.types.Operator):
         return obj and obj.type == "MESH"
 
     def execute(self, context):
-        obj = context.object
-        me = get_edit_mesh()
-        bm = bmesh.from_edit_mesh(me)
+        objects = {obj for obj in context.selected_objects if obj.type == "MESH"}
+        objects.add(context.object)
+        for obj in objects:
+            clear_empty_facemaps(obj)
+        return {"FINISHED"}
 
-        face_map = bm.faces.layers.face_map.active
-        used_indices = {f[face_map] for f in bm.faces}
-        all_indices = {f.index for f in obj.face_maps}
-        tag_remove_indices = all_indices - used_indices
 
-        # -- remove face maps
-        tag_remove_maps = [obj.face_maps[idx] for idx in tag_remove_indices]
-        for fmap in tag_remove_maps:
-            obj.face_maps.remove(fmap)
+class BTOOLS_OT_fmaps_assign_materials(bpy.types.Operator):
+    """Assign the materials of all face maps to their faces"""
+
+    bl_idname = "btools.face_map_assign_materials"
+    bl_label = "Assign face map materials"
+    bl_options = {"REGISTER", "UNDO"}
 
-        # -- remove facemap materials:
-        for idx in reversed(list(tag_remove_indices)):
-            obj.facemap_materials.remove(idx)
+    @classmethod
+    def poll(cls, context):
+        obj = context.object
+        return obj and obj.type == "MESH" and obj.face_maps
 
-        bmesh.update_edit_mesh(me, True)
+    def execute(self, context):
+        set_materials_for_facemaps(context.object)
         return {"FINISHED"}
 
 
@@ -246,6 +248,7 @@ classes = (
     BTOOLS_UL_fmaps,
     SizeOffsetProperty,
     BTOOLS_OT_fmaps_clear,
+    BTOOLS_OT_fmaps_assign_materials,
 )
 
 
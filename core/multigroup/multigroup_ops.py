@@ -1,7 +1,7 @@
 import bpy
 from .multigroup import Multigroup
 from .multigroup_props import MultigroupProperty
-from ...utils import get_selected_face_dimensions
+from ...utils import EditMeshSession, get_selected_face_dimensions
 
 
 class BTOOLS_OT_add_multigroup(bpy.types.Operator):
@@ -18,8 +18,9 @@ class BTOOLS_OT_add_multigroup(bpy.types.Operator):
         return context.object is not None and context.mode == "EDIT_MESH"
 
     def execute(self, context):
-        self.props.init(get_selected_face_dimensions(context))
-        return Multigroup.build(context, self.props)
+        with EditMeshSession(context):
+            self.props.init(get_selected_face_dimensions(context))
+            return Multigroup.build(context, self.props)
 
     def draw(self, context):
         self.props.draw(context, self.layout)
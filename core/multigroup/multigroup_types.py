@@ -1,10 +1,9 @@
-import bmesh
 from ..frame import add_frame_depth
-from ..window.window_types import fill_window_face
+from ..window.window_types import fill_window_faces
 
 from ..arch import (
     fill_arch,
-    create_arch,
+    create_arches,
     add_arch_depth,
 )
 from ..door.door_types import (
@@ -14,15 +13,18 @@ from ..door.door_types import (
 from ...utils import (
     FaceMap,
     local_xyz,
+    MeshRegion,
     valid_ngon,
     get_top_faces,
     get_top_edges,
     popup_message,
     map_new_faces,
     add_faces_to_map,
+    group_faces_by_size,
     calc_face_dimensions,
+    subdivide_faces_vertically,
     subdivide_face_horizontally,
-    subdivide_face_vertically,
+    subdivide_faces_horizontally,
 )
 
 
@@ -37,54 +39,71 @@ def create_multigroup(bm, faces, prop):
 
         face.select = False
 
-        array_faces = subdivide_face_horizontally(bm, face, widths=[prop.size_offset.size.x]*prop.count)
-        for aface in array_faces:
-            face = create_multigroup_split(bm, aface, prop.size_offset.size, prop.size_offset.offset)
-            doors, windows, arch = create_multigroup_frame(bm, face, prop)
-            for door in doors:
-                create_door_fill(bm, door, prop)
-            for window in windows:
-                fill_window_face(bm, window, prop)
-            if prop.add_arch:
-                fill_arch(bm, arch, prop)
+        openings = create_multigroup_split(bm, face, prop.count, prop.size_offset.size, prop.size_offset.offset)
+        dws = parse_components(prop.components)
+        insets = make_multigroup_insets(bm, openings, prop.size_offset.size, prop.frame_thickness, dws)
+        arches = [(None, [])] * len(insets)
+        if prop.add_arch:
+            arches = create_multigroup_arches(bm, insets, dws, prop)
+
+        all_doors, all_windows, arch_faces = [], [], []
+        for (door_faces, window_faces, frame_faces), arch in zip(insets, arches):
+            doors, windows, arch_face = create_multigroup_frame(bm, door_faces, window_faces, frame_faces, arch, prop)
+            all_doors += doors
+            all_windows += windows
+            arch_faces.append(arch_face)
+
+        create_door_fill(bm, all_doors, prop)
+        fill_window_faces(bm, all_windows, prop)
+        if prop.add_arch:
+            fill_arch(bm, arch_faces, prop)
     return True
 
 
 @map_new_faces(FaceMap.WALLS)
-def create_multigroup_split(bm, face, size, offset):
-    """ Use properties from SizeOffset to subdivide face into regular quads
+def create_multigroup_split(bm, face, count, size, offset):
+    """ Use properties from SizeOffset to subdivide face into regular quads,
+        one multigroup opening for each of count array items
     """
 
     wall_w, wall_h = calc_face_dimensions(face)
-    # horizontal split
-    h_widths = [wall_w/2 + offset.x - size.x/2, size.x, wall_w/2 - offset.x - size.x/2]
+    array_w = wall_w / count
+    # horizontal split, for all array items at once
+    h_widths = [array_w/2 + offset.x - size.x/2, size.x, array_w/2 - offset.x - size.x/2] * count
     h_faces = subdivide_face_horizontally(bm, face, h_widths)
     # vertical split
     v_width = [wall_h/2 + offset.y + size.y/2, wall_h/2 - offset.y - size.y/2]
-    v_faces = subdivide_face_vertically(bm, h_faces[1], v_width)
+    v_faces = subdivide_faces_vertically(bm, h_faces[1::3], v_width)
 
-    return v_faces[0]
+    return [f[0] for f in v_faces]
 
 
-def create_multigroup_frame(bm, face, prop):
-    """ Extrude and inset face to make multigroup frame
+def create_multigroup_arches(bm, insets, dws, prop):
+    """ Create the arches of all multigroup insets, returns the arch face and
+        arch frame faces of each
     """
-    normal = face.normal.copy()
-
-    dws = parse_components(prop.components)
-    door_faces, window_faces, frame_faces = make_multigroup_insets(bm, face, prop.size_offset.size, prop.frame_thickness, dws)
-    arch_face = None
-
-    # create arch
-    if prop.add_arch:
-        dw_count = count(dws)
-        top_edges = get_top_edges({e for f in get_top_faces(frame_faces, n=2*dw_count+1)[-dw_count-1:] for e in f.edges}, n=dw_count+1)
+    dw_count = count(dws)
+    top_edges = []
+    for door_faces, window_faces, frame_faces in insets:
+        top_edges.append(get_top_edges({e for f in get_top_faces(frame_faces, n=2*dw_count+1)[-dw_count-1:] for e in f.edges}, n=dw_count+1))
         if dw_count == 1:
             frame_faces.remove(get_top_faces(frame_faces).pop()) # remove top face from frame_faces
-        arch_face, arch_frame_faces = create_arch(bm, top_edges, frame_faces, prop.arch, prop.frame_thickness, local_xyz(face))
-        frame_faces += arch_frame_faces
+    door_faces, window_faces, _ = insets[0]
+    return create_arches(bm, top_edges, prop.arch, prop.frame_thickness, local_xyz((door_faces + window_faces)[0]))
+
 
-    bmesh.ops.recalc_face_normals(bm, faces=list(bm.faces))
+def create_multigroup_frame(bm, door_faces, window_faces, frame_faces, arch, prop):
+    """ Extrude around the inset door and window faces to make multigroup
+        frame, arch is the arch face and arch frame faces from
+        create_multigroup_arches
+    """
+    face = (door_faces + window_faces)[0]
+    normal = face.normal.copy()
+    arch_face, arch_frame_faces = arch
+    frame_faces += arch_frame_faces
+
+    region = door_faces + window_faces + [arch_face] + frame_faces
+    MeshRegion(bm, region).recalc_face_normals()
 
     # add depths
     if prop.add_arch:
@@ -129,30 +148,35 @@ def add_multi_window_depth(bm, window_faces, depth, normal):
     return new_window_faces, new_frame_faces
 
 
-def make_multigroup_insets(bm, face, size, frame_thickness, dws):
+def make_multigroup_insets(bm, faces, size, frame_thickness, dws):
+    """ Cut the door and window insets of each face, returns the door, window
+        and frame faces of each. Faces of the same size are cut together
+    """
     dw_count = count(dws)
     dw_width = (size.x - frame_thickness * (dw_count + 1)) / dw_count
-    door_height = calc_face_dimensions(face)[1] - frame_thickness
     window_height = size.y - 2 * frame_thickness
 
     # adjacent doors/windows clubbed
     clubbed_widths = [clubbed_width(dw_width, frame_thickness, dw['type'], dw['count'], i == 0, i == len(dws)-1) for i, dw in enumerate(dws)]
-    clubbed_faces = subdivide_face_horizontally(bm, face, clubbed_widths)
 
-    doors = []
-    windows = []
-    frames = []
-
-    for i, (dw, f) in enumerate(zip(dws, clubbed_faces)):
-        if dw['type'] == 'door':
-            ds, fs = make_door_insets(bm, f, dw['count'], door_height, dw_width, frame_thickness, i == 0, i == len(dws)-1)
-            doors.extend(ds)
-            frames.extend(fs)
-        elif dw['type'] == 'window':
-            ws, fs = make_window_insets(bm, f, dw['count'], window_height, dw_width, frame_thickness, i == 0, i == len(dws)-1)
-            windows.extend(ws)
-            frames.extend(fs)
-    return doors, windows, frames
+    insets = [([], [], []) for _ in faces]
+    for (_, face_height), indices in group_faces_by_size(faces).items():
+        door_height = face_height - frame_thickness
+        clubbed_faces = subdivide_faces_horizontally(bm, [faces[idx] for idx in indices], clubbed_widths)
+        group_insets = [insets[idx] for idx in indices]
+        for i, dw in enumerate(dws):
+            club = [f[i] for f in clubbed_faces]
+            if dw['type'] == 'door':
+                res = make_door_insets(bm, club, dw['count'], door_height, dw_width, frame_thickness, i == 0, i == len(dws)-1)
+                for (doors, _, frames), (ds, fs) in zip(group_insets, res):
+                    doors.extend(ds)
+                    frames.extend(fs)
+            elif dw['type'] == 'window':
+                res = make_window_insets(bm, club, dw['count'], face_height, window_height, dw_width, frame_thickness, i == 0, i == len(dws)-1)
+                for (_, windows, frames), (ws, fs) in zip(group_insets, res):
+                    windows.extend(ws)
+                    frames.extend(fs)
+    return insets
 
 
 def clubbed_width(width, frame_thickness, type, count, first=False, last=False):
@@ -167,14 +191,15 @@ def clubbed_width(width, frame_thickness, type, count, first=False, last=False):
             return (width * count) + (frame_thickness * (count-1))
 
 
-def make_window_insets(bm, face, count, window_height, window_width, frame_thickness, first=False, last=False):
+def make_window_insets(bm, faces, count, face_height, window_height, window_width, frame_thickness, first=False, last=False):
+    """ Cut count windows into each of faces, all face_height high, returns
+        the window and frame faces of each. A face that does not split
+        vertically gets no windows
+    """
     # split vertically for window
-    face_height = calc_face_dimensions(face)[1]
-    res = subdivide_face_vertically(bm, face, [face_height - (window_height+2*frame_thickness), window_height+2*frame_thickness])
-    if not res:
-        return [], []
+    res = subdivide_faces_vertically(bm, faces, [face_height - (window_height+2*frame_thickness), window_height+2*frame_thickness])
+    split = [idx for idx, pieces in enumerate(res) if len(pieces) > 1]
 
-    face = res[1]
     # vertical frame
     if first and last:
         h_widths = [frame_thickness, window_width] * count + [frame_thickness]
@@ -184,28 +209,42 @@ def make_window_insets(bm, face, count, window_height, window_width, frame_thick
         h_widths = [window_width, frame_thickness] * count
     else:
         h_widths = [window_width, frame_thickness] * (count-1) + [window_width]
-    h_faces = subdivide_face_horizontally(bm, face, h_widths)
+    h_faces = subdivide_faces_horizontally(bm, [res[idx][1] for idx in split], h_widths)
     # horizontal frames
     if first:
-        work_faces = h_faces[1::2]
-        v_frames = h_faces[::2]
+        work_faces = [h[1::2] for h in h_faces]
+        v_frames = [h[::2] for h in h_faces]
     else:
-        work_faces = h_faces[::2]
-        v_frames = h_faces[1::2]
+        work_faces = [h[::2] for h in h_faces]
+        v_frames = [h[1::2] for h in h_faces]
     v_widths = [frame_thickness, window_height, frame_thickness]
-    v_faces = [f for h_face in work_faces for f in subdivide_face_vertically(bm, h_face, v_widths)]
+    remaining = subdivide_faces_vertically(bm, [w for work in work_faces for w in work], v_widths)
 
-    return v_faces[1::3], v_frames + v_faces[::3] + v_faces[2::3]
+    insets = [([], []) for _ in faces]
+    for idx, work, frames in zip(split, work_faces, v_frames):
+        pane_faces = [f for v in remaining[:len(work)] for f in v]
+        remaining = remaining[len(work):]
+        insets[idx] = (pane_faces[1::3], frames + pane_faces[::3] + pane_faces[2::3])
+    return insets
 
 
-def make_door_insets(bm, face, count, door_height, door_width, frame_thickness, first=False, last=False):
+def make_door_insets(bm, faces, count, door_height, door_width, frame_thickness, first=False, last=False):
+    """ Cut count doors into each of faces, returns the door and frame faces
+        of each
+    """
     # vertical frame
     h_widths = [frame_thickness, door_width] * count + [frame_thickness]
-    h_faces = subdivide_face_horizontally(bm, face, h_widths)
+    h_faces = subdivide_faces_horizontally(bm, faces, h_widths)
     # horizontal frames
     v_widths = [door_height, frame_thickness]
-    v_faces = [f for h_face in h_faces[1::2] for f in subdivide_face_vertically(bm, h_face, v_widths)]
-    return v_faces[::2], h_faces[::2] + v_faces[1::2]
+    remaining = subdivide_faces_vertically(bm, [f for h in h_faces for f in h[1::2]], v_widths)
+
+    insets = []
+    for h in h_faces:
+        door_faces = [f for v in remaining[:count] for f in v]
+        remaining = remaining[count:]
+        insets.append((door_faces[::2], h[::2] + door_faces[1::2]))
+    return insets
 
 
 def count(dws):
@@ -5,6 +5,7 @@ from mathutils import Vector, Matrix, Quaternion
 from ...utils import (
     clamp,
     FaceMap,
+    MeshRegion,
     sort_edges,
     edge_vector,
     filter_geom,
@@ -129,13 +130,13 @@ def create_fill_walls(bm, face, prop):
     # create walls
     wall_size = clamp(prop.wall_fill.width, 0.001, prop.corner_post_width)
 
-    ret = bmesh.ops.duplicate(bm, geom=[face])
+    ret = MeshRegion.record(bmesh.ops.duplicate(bm, geom=[face]))
     dup_face = filter_geom(ret["geom"], BMFace)[0]
     bmesh.ops.translate(bm, verts=dup_face.verts, vec=-face.normal*wall_size/2)
-    ret = bmesh.ops.extrude_edge_only(bm, edges=dup_face.edges)
+    ret = MeshRegion.record(bmesh.ops.extrude_edge_only(bm, edges=dup_face.edges))
     verts = filter_geom(ret["geom"], BMVert)
     bmesh.ops.translate(bm, verts=verts, vec=face.normal*wall_size)
-    bmesh.ops.contextual_create(bm, geom=verts)
+    MeshRegion.record(bmesh.ops.contextual_create(bm, geom=verts))
 
     # delete reference faces and hidden faces
     bmesh.ops.delete(bm, geom=[face] + filter_geom(ret['geom'], BMFace), context="FACES")
@@ -152,7 +153,7 @@ def edge_to_cylinder(bm, edge, radius, up, n=4, fill=False):
     all_verts = [v for v in edge.verts]
     dir.rotate(Quaternion(edge_vec, math.pi-theta/2).to_euler())
     for i in range(0, n):
-        ret = bmesh.ops.extrude_edge_only(bm, edges=[edge])
+        ret = MeshRegion.record(bmesh.ops.extrude_edge_only(bm, edges=[edge]))
         edge = filter_geom(ret["geom"], BMEdge)[0]
         bmesh.ops.translate(bm, verts=edge.verts, vec=dir*length)
         dir.rotate(Quaternion(edge_vec, math.radians(360/n)).to_euler())
@@ -165,8 +166,8 @@ def edge_to_cylinder(bm, edge, radius, up, n=4, fill=False):
         sorted_edges = sort_edges({e for v in valid_verts for e in v.link_edges}, edge_vec)
         top_edges = sorted_edges[-n:]
         bottom_edges = sorted_edges[:n]
-        bmesh.ops.holes_fill(bm, edges=top_edges)
-        bmesh.ops.holes_fill(bm, edges=bottom_edges)
+        MeshRegion.record(bmesh.ops.holes_fill(bm, edges=top_edges))
+        MeshRegion.record(bmesh.ops.holes_fill(bm, edges=bottom_edges))
 
 
 def scale_railing_edge(bm, edge, amount):
@@ -1,5 +1,5 @@
 import bpy
-from bpy.props import EnumProperty, FloatProperty, BoolProperty
+from bpy.props import EnumProperty, FloatProperty, BoolProperty, IntProperty
 
 
 class RoofProperty(bpy.types.PropertyGroup):
@@ -47,6 +47,14 @@ class RoofProperty(bpy.types.PropertyGroup):
         name="Flip Direction", default=False, description="Whether to change direction of roof axis"
     )
 
+    processes: IntProperty(
+        name="Processes",
+        min=1,
+        max=64,
+        default=1,
+        description="Processes that compute the roofs of separate faces, 1 keeps them in blender",
+    )
+
     def draw(self, context, layout):
         layout.prop(self, "type", text="")
 
@@ -66,9 +74,12 @@ class RoofProperty(bpy.types.PropertyGroup):
             col.prop(self, "height")
 
             box.prop(self, "roof_hangs", toggle=True)
+            box.prop(self, "processes")
 
         else:
             col = box.column(align=True)
             col.prop(self, "thickness")
             col.prop(self, "outset")
             col.prop(self, "height")
+
+            box.prop(self, "processes")
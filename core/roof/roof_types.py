@@ -1,21 +1,26 @@
+import math
 import bmesh
 import mathutils
-from mathutils import Vector, Matrix
-from bmesh.types import BMVert, BMEdge, BMFace
+from collections import Counter
+from mathutils import Vector
+from bmesh.types import BMVert, BMFace
 from ...utils import (
     equal,
     select,
     FaceMap,
     validate,
-    edge_vector,
-    skeletonize,
+    MeshRegion,
     filter_geom,
+    face_islands,
     popup_message,
     map_new_faces,
+    skeleton_faces,
+    skeleton_arrays,
+    rectangle_gable_faces,
     calc_edge_median,
     add_faces_to_map,
-    calc_verts_median,
     add_facemap_for_groups,
+    skeletonize_many_cached,
 )
 
 
@@ -37,74 +42,199 @@ def create_roof(bm, faces, prop):
 def create_flat_roof(bm, faces, prop):
     """Create a flat roof
     """
-    ret = bmesh.ops.extrude_face_region(bm, geom=faces)
+    ret = MeshRegion.record(bmesh.ops.extrude_face_region(bm, geom=faces))
     bmesh.ops.translate(
         bm, vec=(0, 0, prop.thickness), verts=filter_geom(ret["geom"], BMVert)
     )
     top_face = filter_geom(ret["geom"], BMFace)
     if len(top_face) > 1:
-        top_face = bmesh.ops.dissolve_faces(
-            bm, faces=top_face, use_verts=True).get("region").pop()
+        top_face = MeshRegion.record(bmesh.ops.dissolve_faces(
+            bm, faces=top_face, use_verts=True)).get("region").pop()
     else:
         top_face = top_face.pop()
 
-    link_faces = [f for e in top_face.edges for f in e.link_faces if f is not top_face]
+    # -- the sides of the slab, extrude_face_region leaves them out of its output
+    link_faces = MeshRegion.record([f for e in top_face.edges for f in e.link_faces if f is not top_face])
 
-    bmesh.ops.inset_region(
+    inset_faces = MeshRegion.record(bmesh.ops.inset_region(
         bm, faces=link_faces, depth=prop.outset, use_even_offset=True
-    )
-    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+    )).get("faces")
+    MeshRegion(bm, [top_face] + link_faces + inset_faces).recalc_face_normals()
     bmesh.ops.delete(bm, geom=faces, context="FACES")
 
     new_faces = list({f for e in top_face.edges for f in e.link_faces})
-    return bmesh.ops.dissolve_faces(bm, faces=new_faces).get("region")
+    return MeshRegion.record(bmesh.ops.dissolve_faces(bm, faces=new_faces)).get("region")
 
 
 def create_gable_roof(bm, faces, prop):
-    """Create a gable roof
+    """Create a gable roof on every island of faces
     """
-    if len(faces) > 1:
-        faces = bmesh.ops.dissolve_faces(bm, faces=faces, use_verts=True).get("region")
+    footprints = []
+    for island in face_islands(faces):
+        if len(island) > 1:
+            island = bmesh.ops.dissolve_faces(bm, faces=island, use_verts=True).get("region")
+        face = island[-1]
+        dissolve_lone_verts(bm, face, list(face.edges))
+        verts = [v for v in sort_verts_by_loops(face)]
+        footprints.append((face, verts, len(verts) == 4 and is_rectangular(face)))
+    footprint_points = [[v.co.to_tuple()[:2] for v in verts] for _, verts, _ in footprints]
+
+    # -- rectangles are gabled directly, along the axis picked by flip_direction
+    skeletons = iter(skeletonize_many_cached(
+        [points for points, (*_, rect) in zip(footprint_points, footprints) if not rect],
+        max_workers=prop.processes,
+    ))
+
+    for (face, verts, rect), points in zip(footprints, footprint_points):
+        if rect:
+            nodes, polygons, walls = rectangle_gable_faces(points, prop.flip_direction)
+        else:
+            skeleton = skeleton_arrays(next(skeletons), points)
+            try:
+                polygons = skeleton_faces(skeleton, points)
+            except ValueError:
+                popup_message("Gable Roof could not be created for this face", "Context Error")
+                continue
+            nodes, polygons, walls = skeleton_gable_faces(skeleton, polygons, len(points))
 
-    if not is_rectangular(faces[0]):
-        popup_message("Gable Roof can only be created on rectangular faces", "Context Error")
-        return
+        base_z = face.calc_center_median().z
+        bmesh.ops.delete(bm, geom=[face], context="FACES_ONLY")
+        create_gable_mesh(bm, verts, nodes, polygons, walls, base_z, prop)
 
-    edges = extrude_up_and_delete_faces(bm, faces, prop.height)
-    sedges = sorted(edges, key=lambda e: e.calc_length())
-    normal_edge = edge_vector(sedges[0])
-    if prop.flip_direction:
-        normal_edge = edge_vector(sedges[-1])
 
-    # -- cleanup any lone edges
-    if len(edges) > 4:
-        sverts = list({v for e in sedges for v in e.verts})
-        lone_edges = [e for v in sverts for e in v.link_edges if e not in sedges and equal(e.calc_face_angle(), 0)]
-        bmesh.ops.dissolve_edges(bm, edges=lone_edges, use_verts=True)
-        edges = validate(edges)
+def skeleton_gable_faces(skeleton, polygons, count):
+    """ Turn the hip faces of skeleton into a gable: every triangular end
+    face gets its apex moved onto its footprint edge and becomes a wall.
+    Returns nodes (x, y, height lists), polygons and wall polygon indices
+    """
+    xs, ys, heights = list(skeleton.x), list(skeleton.y), list(skeleton.height)
+    faces_at = Counter(node for polygon in polygons for node in polygon)
+    ends = [
+        (i, polygon) for i, polygon in enumerate(polygons)
+        if len(polygon) == 3 and polygon[2] >= count
+    ]
+    apexes = Counter(polygon[2] for _, polygon in ends)
+
+    walls = set()
+    for i, (a, b, apex) in ends:
+        # -- only the end of a ridge, pyramids keep their hips
+        if apexes[apex] != 1 or faces_at[apex] != 3:
+            continue
+        dx, dy = xs[b] - xs[a], ys[b] - ys[a]
+        t = ((xs[apex] - xs[a]) * dx + (ys[apex] - ys[a]) * dy) / (dx * dx + dy * dy)
+        if 0 < t < 1:
+            xs[apex], ys[apex] = xs[a] + t * dx, ys[a] + t * dy
+            walls.add(i)
+    return (xs, ys, heights), polygons, walls
+
+
+def create_gable_mesh(bm, verts, nodes, polygons, walls, base_z, prop):
+    """ Create the walls, roof faces and hangs of a gable in one pass, node k
+    of polygons is verts[k] for the footprint nodes
+    """
+    xs, ys, heights = nodes
+    height_scale = prop.height / max(heights)
 
-    merge_normal = normal_edge.cross(Vector((0, 0, 1)))
-    merge_edges_along_normal(bm, edges, merge_normal)
-    roof_faces = list({f for e in edges for f in e.link_faces})
-    bmesh.ops.dissolve_degenerate(bm, dist=0.01, edges=edges)
+    def location(k):
+        return Vector((xs[k], ys[k], base_z + heights[k] * height_scale))
 
-    if prop.roof_hangs:
+    node_verts = dict(enumerate(verts))
 
-        def has_one_roof_face(e):
-            return not all([f in roof_faces for f in e.link_faces])
+    def vert(k):
+        if k not in node_verts:
+            node_verts[k] = bm.verts.new(location(k))
+        return node_verts[k]
 
-        roof_faces = [f for f in validate(roof_faces) if f.normal.z]
-        boundary_edges = [
-            e for f in roof_faces for e in f.edges if has_one_roof_face(e)
-        ]
-        bmesh.ops.delete(bm, geom=roof_faces, context="FACES")
+    wall_faces = [bm.faces.new([vert(k) for k in polygons[i]]) for i in sorted(walls)]
+    surface = [polygon for i, polygon in enumerate(polygons) if i not in walls]
 
-        hang_edges = create_roof_hangs(bm, boundary_edges, prop.outset)
-        fill_roof_faces_from_hang(bm, hang_edges, prop.thickness)
+    boundary = [
+        (u, v)
+        for polygon in surface
+        for u, v in zip(polygon, polygon[1:] + polygon[:1])
+    ]
+    inner = set(boundary)
+    boundary = [(u, v) for u, v in boundary if (v, u) not in inner]
+    following = dict(boundary)
+
+    # -- the surface itself is the roof without hangs, or if its boundary pinches
+    if not prop.roof_hangs or len(following) != len(boundary):
+        roof_faces = [bm.faces.new([vert(k) for k in polygon]) for polygon in surface]
+        add_faces_to_map(bm, wall_faces, FaceMap.WALLS)
+        add_faces_to_map(bm, roof_faces, FaceMap.ROOF)
+        return
+
+    preceding = {v: u for u, v in boundary}
+
+    def outward(u, v):
+        dx, dy = xs[v] - xs[u], ys[v] - ys[u]
+        length = math.hypot(dx, dy)
+        return dy / length, -dx / length
+
+    def is_eave(u, v):
+        return u < len(verts) and v < len(verts)
+
+    # -- hang the boundary out by outset, eaves drop along the roof slope
+    low_verts = {}
+    for k in following:
+        p, q = preceding[k], following[k]
+        n1, n2 = outward(p, k), outward(k, q)
+        miter = prop.outset / max(1 + n1[0] * n2[0] + n1[1] * n2[1], 0.1)
+        offset = Vector(((n1[0] + n2[0]) * miter, (n1[1] + n2[1]) * miter, 0))
+        if is_eave(p, k) or is_eave(k, q):
+            offset.z = -prop.outset * height_scale
+        low_verts[k] = bm.verts.new(location(k) + offset)
+
+    lift = Vector((0, 0, prop.thickness))
+    top_verts = {}
+    for k in {k for polygon in surface for k in polygon}:
+        co = low_verts[k].co if k in low_verts else location(k)
+        top_verts[k] = bm.verts.new(co + lift)
+
+    roof_faces = [bm.faces.new([top_verts[k] for k in polygon]) for polygon in surface]
+    hang_faces = []
+    for u, v in boundary:
+        hang_faces.append(bm.faces.new([vert(u), vert(v), low_verts[v], low_verts[u]]))
+        hang_faces.append(
+            bm.faces.new([low_verts[u], low_verts[v], top_verts[v], top_verts[u]])
+        )
+
+    add_faces_to_map(bm, wall_faces, FaceMap.WALLS)
+    add_faces_to_map(bm, roof_faces, FaceMap.ROOF)
+    add_faces_to_map(bm, hang_faces, FaceMap.ROOF_HANGS)
 
 
 def create_hip_roof(bm, faces, prop):
-    """Create a hip roof
+    """Create a hip roof on every island of faces
+    """
+    footprints = [create_hip_footprint(bm, island, prop) for island in face_islands(faces)]
+    footprint_points = [[v.co.to_tuple()[:2] for v in verts] for *_, verts in footprints]
+
+    # compute all straight skeletons at once, redo only changes the heights
+    skeletons = skeletonize_many_cached(footprint_points, max_workers=prop.processes)
+
+    for footprint, points, skeleton in zip(footprints, footprint_points, skeletons):
+        faces, original_edges, median, verts = footprint
+        skeleton = skeleton_arrays(skeleton, points)
+        bmesh.ops.delete(bm, geom=faces, context="FACES_ONLY")
+
+        height_scale = prop.height / max(skeleton.height)
+
+        try:
+            polygons = skeleton_faces(skeleton, points)
+        except ValueError:
+            # -- degenerate skeleton, stitch the faces together from its edges
+            skeleton_edges = create_hiproof_verts_and_edges(
+                bm, skeleton, original_edges, median, height_scale
+            )
+            create_hiproof_faces(bm, original_edges, skeleton_edges)
+        else:
+            create_hiproof_mesh(bm, skeleton, polygons, verts, median, height_scale)
+
+
+def create_hip_footprint(bm, faces, prop):
+    """ Create the roof hangs of faces and return the faces to replace, the
+    original edges, median and verts of the footprint of the hip roof
     """
     roof_hang = map_new_faces(FaceMap.ROOF_HANGS)(create_flat_roof)
     faces = roof_hang(bm, faces, prop)
@@ -116,21 +246,23 @@ def create_hip_roof(bm, faces, prop):
 
     # get verts in anti-clockwise order
     verts = [v for v in sort_verts_by_loops(face)]
-    points = [v.co.to_tuple()[:2] for v in verts]
-
-    # compute straight skeleton
-    skeleton = skeletonize(points, [])
-    bmesh.ops.delete(bm, geom=faces, context="FACES_ONLY")
+    return faces, original_edges, median, verts
 
-    height_scale = prop.height / max([arc.height for arc in skeleton])
 
-    # -- create edges and vertices
-    skeleton_edges = create_hiproof_verts_and_edges(
-        bm, skeleton, original_edges, median, height_scale
-    )
+def create_hiproof_mesh(bm, skeleton, polygons, verts, median, height_scale):
+    """ Create the roof faces of polygons, lists of skeleton node indices whose
+    first nodes are verts, with all new verts and faces added in one pass
+    """
+    node_verts = dict(enumerate(verts))
+    for polygon in polygons:
+        for node in polygon:
+            if node not in node_verts:
+                z = median.z + skeleton.height[node] * height_scale
+                node_verts[node] = bm.verts.new((skeleton.x[node], skeleton.y[node], z))
 
-    # -- create faces
-    create_hiproof_faces(bm, original_edges, skeleton_edges)
+    roof_faces = [bm.faces.new([node_verts[node] for node in polygon]) for polygon in polygons]
+    add_faces_to_map(bm, roof_faces, FaceMap.ROOF)
+    return roof_faces
 
 
 def is_rectangular(face):
@@ -184,9 +316,70 @@ def sort_verts_by_loops(face):
     return verts
 
 
+class VertHash:
+    """ Verts bucketed by their quantized x, y coordinates, so that looking up
+    the verts at a location does not scan every vert
+    """
+
+    def __init__(self, verts=(), size=0.01):
+        self.size = size
+        self.cells = {}
+        for vert in verts:
+            self.add(vert)
+
+    def cell(self, x, y):
+        return int(x // self.size), int(y // self.size)
+
+    def add(self, vert):
+        self.cells.setdefault(self.cell(vert.co.x, vert.co.y), []).append(vert)
+
+    def near(self, loc):
+        """ Verts in the cells around loc, a superset of those equal to it
+        """
+        cx, cy = self.cell(loc.x, loc.y)
+        return [
+            vert
+            for x in (cx - 1, cx, cx + 1)
+            for y in (cy - 1, cy, cy + 1)
+            for vert in self.cells.get((x, y), [])
+        ]
+
+
+class EdgeGrid:
+    """ Edges bucketed by the grid cells their x, y bounds overlap, so that
+    finding the edges that may pass through a point does not test them all
+    """
+
+    def __init__(self, edges, eps=0.001):
+        lengths = [e.calc_length() for e in edges]
+        # -- cells about the size of an edge keep each bucket short
+        self.size = max(sum(lengths) / max(len(lengths), 1), 0.01)
+        self.cells = {}
+        for e in edges:
+            v1, v2 = e.verts
+            x0, x1 = sorted((v1.co.x, v2.co.x))
+            y0, y1 = sorted((v1.co.y, v2.co.y))
+            (cx0, cy0), (cx1, cy1) = self.cell(x0 - eps, y0 - eps), self.cell(x1 + eps, y1 + eps)
+            for x in range(cx0, cx1 + 1):
+                for y in range(cy0, cy1 + 1):
+                    self.cells.setdefault((x, y), []).append(e)
+
+    def cell(self, x, y):
+        return int(x // self.size), int(y // self.size)
+
+    def near(self, loc):
+        """ Edges whose bounds contain loc, in the order they were given
+        """
+        return self.cells.get(self.cell(loc.x, loc.y), [])
+
+
 def vert_at_loc(loc, verts, loc_z=None):
     """ Find all verts at loc(x,y), return the one with highest z coord
+    verts can also be a VertHash to only check the verts near loc
     """
+    if isinstance(verts, VertHash):
+        verts = verts.near(loc)
+
     results = []
     for vert in verts:
         co = vert.co
@@ -202,96 +395,28 @@ def vert_at_loc(loc, verts, loc_z=None):
     return None
 
 
-@map_new_faces(FaceMap.WALLS)
-def extrude_up_and_delete_faces(bm, faces, extrude_depth):
-    """ Extrude faces upwards and delete ones at top
-    """
-    ret = bmesh.ops.extrude_face_region(bm, geom=faces)
-    verts = filter_geom(ret["geom"], BMVert)
-    edges = filter_geom(ret["geom"], BMEdge)
-    nfaces = filter_geom(ret["geom"], BMFace)
-    bmesh.ops.translate(bm, verts=verts, vec=(0, 0, extrude_depth))
-    bmesh.ops.delete(bm, geom=faces + nfaces, context="FACES_ONLY")
-    return edges
-
-
-def merge_edges_along_normal(bm, edges, normal):
-    """ Merge verts so that they lie along the midpoint perpendicular to a normal
-    """
-    def vabs(vec):
-        return tuple(map(abs, vec.to_tuple(3)))
-
-    for edge in edges:
-        if vabs(edge_vector(edge)) == vabs(normal):
-            cen = calc_edge_median(edge)
-            for v in edge.verts:
-                v.co = cen
-    bmesh.ops.remove_doubles(bm, verts=bm.verts)
-
-
-@map_new_faces(FaceMap.ROOF_HANGS)
-def create_roof_hangs(bm, edges, size):
-    """Extrude edges outwards and slope the downward to form proper hangs
-    """
-    ret = bmesh.ops.extrude_edge_only(bm, edges=edges)
-    verts = filter_geom(ret["geom"], BMVert)
-    bmesh.ops.scale(bm, verts=verts, vec=(1 + size, 1 + size, 1),
-                    space=Matrix.Translation(-calc_verts_median(verts)))
-
-    hang_edges = list(
-        {e for v in verts for e in v.link_edges if all([v in verts for v in e.verts])}
-    )
-
-    # -- fix roof slope at bottom edges
-    min_loc_z = min([v.co.z for e in hang_edges for v in e.verts])
-    min_verts = list({v for e in hang_edges for v in e.verts if v.co.z == min_loc_z})
-    bmesh.ops.translate(bm, verts=min_verts, vec=(0, 0, -size))
-    return hang_edges
-
-
-def fill_roof_faces_from_hang(bm, edges, roof_thickness):
-    """ Use edges formed for hang to form complete roof
-    """
-    # -- extrude edges upwards
-    ret = bmesh.ops.extrude_edge_only(bm, edges=edges)
-    verts = filter_geom(ret["geom"], BMVert)
-    edges = filter_geom(ret["geom"], BMEdge)
-    bmesh.ops.translate(bm, verts=verts, vec=(0, 0, roof_thickness))
-
-    min_z = min([v.co.z for e in edges for v in e.verts])
-    valid_edges = list(filter(lambda e: calc_edge_median(e).z != min_z, edges))
-    ret = bmesh.ops.bridge_loops(bm, edges=valid_edges, use_pairs=True)
-    add_faces_to_map(bm, ret["faces"], FaceMap.ROOF)
-    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
-
-
 def create_hiproof_verts_and_edges(bm, skeleton, original_edges, median, height_scale):
     """ Create the vertices and edges from output of straight skeleton
     """
-    skeleton_edges = []
+    # -- only the footprint and the skeleton itself can share a location
+    vert_hash = VertHash({v for e in original_edges for v in e.verts})
     skeleton_verts = []
-    for arc in skeleton:
-        source = arc.source
-        vsource = vert_at_loc(source, bm.verts)
-        if not vsource:
-            source_height = [arc.height for arc in skeleton if arc.source == source]
-            ht = source_height.pop() * height_scale
-            vsource = make_vert(bm, Vector((source.x, source.y, median.z + ht)))
-            skeleton_verts.append(vsource)
-
-        for sink in arc.sinks:
-            vs = vert_at_loc(sink, bm.verts)
-            if not vs:
-                sink_height = min([arc.height for arc in skeleton if sink in arc.sinks])
-                ht = height_scale * sink_height
-                vs = make_vert(bm, Vector((sink.x, sink.y, median.z + ht)))
-            skeleton_verts.append(vs)
-
-            # create edge
-            if vs != vsource:
-                geom = bmesh.ops.contextual_create(bm, geom=[vsource, vs]).get("edges")
-                skeleton_edges.extend(geom)
-    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
+    node_verts = []
+    for x, y, height in zip(skeleton.x, skeleton.y, skeleton.height):
+        vert = vert_at_loc(Vector((x, y)), vert_hash)
+        if not vert:
+            location = Vector((x, y, median.z + height * height_scale))
+            vert = make_vert(bm, location, vert_hash)
+            skeleton_verts.append(vert)
+        node_verts.append(vert)
+
+    skeleton_edges = []
+    edges = skeleton.edges
+    for i in range(0, len(edges), 2):
+        v1, v2 = node_verts[edges[i]], node_verts[edges[i + 1]]
+        if v1 != v2:
+            skeleton_edges.append(bm.edges.get((v1, v2)) or bm.edges.new((v1, v2)))
+    bmesh.ops.remove_doubles(bm, verts=list(dict.fromkeys(node_verts)), dist=0.0001)
 
     skeleton_edges = validate(skeleton_edges)
     S_verts = {v for e in skeleton_edges for v in e.verts}
@@ -312,34 +437,40 @@ def create_hiproof_faces(bm, original_edges, skeleton_edges):
 
         if len(opposite_verts) == 1:
             # -- triangle
-            bmesh.ops.contextual_create(bm, geom=linked_skeleton_edges + [ed])
+            MeshRegion.record(bmesh.ops.contextual_create(bm, geom=linked_skeleton_edges + [ed]))
         else:
             edge = bm.edges.get(opposite_verts)
             if edge:
                 # -- quad
                 geometry = linked_skeleton_edges + [ed, edge]
-                bmesh.ops.contextual_create(bm, geom=geometry)
+                MeshRegion.record(bmesh.ops.contextual_create(bm, geom=geometry))
             else:
                 # -- polygon
                 edges = cycle_edges_form_polygon(
                     bm, opposite_verts, skeleton_edges, linked_skeleton_edges
                 )
-                bmesh.ops.contextual_create(bm, geom=[ed] + edges)
+                MeshRegion.record(bmesh.ops.contextual_create(bm, geom=[ed] + edges))
 
 
-def make_vert(bm, location):
-    """ Create a vertex at location
+def make_vert(bm, location, vert_hash=None):
+    """ Create a vertex at location, added to vert_hash when given
     """
-    return bmesh.ops.create_vert(bm, co=location).get("vert").pop()
+    vert = bmesh.ops.create_vert(bm, co=location).get("vert").pop()
+    if vert_hash is not None:
+        vert_hash.add(vert)
+    return vert
 
 
 def join_intersecting_verts_and_edges(bm, edges, verts):
     """ Find all vertices that intersect/ lie at an edge and merge
     them to that edge
     """
+    grid = EdgeGrid(edges)
+    roof_verts = list(dict.fromkeys([v for e in edges for v in e.verts] + list(verts)))
+
     new_verts = []
     for v in verts:
-        for e in edges:
+        for e in grid.near(v.co):
             if v in e.verts:
                 continue
 
@@ -350,7 +481,7 @@ def join_intersecting_verts_and_edges(bm, edges, verts):
                 split_factor = (v1.co - v.co).length / e.calc_length()
                 new_edge, new_vert = bmesh.utils.edge_split(e, split_vert, split_factor)
                 new_verts.append(new_vert)
-    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.01)
+    bmesh.ops.remove_doubles(bm, verts=roof_verts + new_verts, dist=0.01)
     return validate(new_verts)
 
 
@@ -1,18 +1,17 @@
-import bmesh
-
 from ..generic import clamp_count
 from ..frame import add_frame_depth
 from ..fill import fill_bar, fill_louver, fill_glass_panes, FillUser
 
 from ..arch import (
     fill_arch,
-    create_arch,
+    create_arches,
     add_arch_depth,
 )
 from ...utils import (
     FaceMap,
     validate,
     local_xyz,
+    MeshRegion,
     valid_ngon,
     popup_message,
     get_top_edges,
@@ -23,64 +22,80 @@ from ...utils import (
     extrude_face_region,
     calc_face_dimensions,
     add_facemap_for_groups,
-    subdivide_face_vertically,
+    subdivide_faces_vertically,
     subdivide_face_horizontally,
+    subdivide_faces_horizontally,
 )
 
 
 def create_window(bm, faces, prop):
     """Generate a window
     """
-    for face in faces:
-        if not valid_ngon(face):
-            popup_message("Window creation not supported for non-rectangular n-gon", "Ngon Error")
-            return False
-
-        face.select = False
-        clamp_count(calc_face_dimensions(face)[0], prop.frame_thickness * 2, prop)
-        array_faces = subdivide_face_horizontally(bm, face, widths=[prop.size_offset.size.x]*prop.count)
-        for aface in array_faces:
-            face = create_window_split(bm, aface, prop.size_offset.size, prop.size_offset.offset)
-            window, arch = create_window_frame(bm, face, prop)
-            fill_window_face(bm, window, prop)
+    with MeshRegion(bm, faces) as region:
+        for face in faces:
+            if not valid_ngon(face):
+                popup_message("Window creation not supported for non-rectangular n-gon", "Ngon Error")
+                return False
+
+            face.select = False
+            clamp_count(calc_face_dimensions(face)[0], prop.frame_thickness * 2, prop)
+            openings = create_window_split(bm, face, prop.count, prop.size_offset.size, prop.size_offset.offset)
+            insets = make_window_inset(bm, openings, prop.size_offset.size, prop.frame_thickness)
+            arches = [(None, [])] * len(insets)
             if prop.add_arch:
-                fill_arch(bm, arch, prop)
-    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.0001)
+                arches = create_window_arches(bm, insets, prop)
+
+            windows, arch_faces = [], []
+            for (window_face, frame_faces), arch in zip(insets, arches):
+                window, arch_face = create_window_frame(bm, window_face, frame_faces, arch, prop)
+                windows.append(window)
+                arch_faces.append(arch_face)
+
+            fill_window_faces(bm, windows, prop)
+            if prop.add_arch:
+                fill_arch(bm, arch_faces, prop)
+    region.remove_doubles(dist=0.0001)
     return True
 
 
 @map_new_faces(FaceMap.WALLS)
-def create_window_split(bm, face, size, offset):
-    """Use properties from SplitOffset to subdivide face into regular quads
+def create_window_split(bm, face, count, size, offset):
+    """Use properties from SplitOffset to subdivide face into regular quads,
+       one window opening for each of count array items
     """
     wall_w, wall_h = calc_face_dimensions(face)
-    # horizontal split
-    h_widths = [wall_w/2 + offset.x - size.x/2, size.x, wall_w/2 - offset.x - size.x/2]
+    array_w = wall_w / count
+    # horizontal split, for all array items at once
+    h_widths = [array_w/2 + offset.x - size.x/2, size.x, array_w/2 - offset.x - size.x/2] * count
     h_faces = subdivide_face_horizontally(bm, face, h_widths)
     # vertical split
     v_width = [wall_h/2 + offset.y - size.y/2, size.y, wall_h/2 - offset.y - size.y/2]
-    v_faces = subdivide_face_vertically(bm, h_faces[1], v_width)
+    v_faces = subdivide_faces_vertically(bm, h_faces[1::3], v_width)
 
-    return v_faces[1]
+    return [f[1] for f in v_faces]
 
 
-def create_window_frame(bm, face, prop):
-    """Create extrude and inset around a face to make window frame
+def create_window_arches(bm, insets, prop):
+    """Create the arches of all inset windows, returns the arch face and arch
+       frame faces of each
     """
+    top_edges = []
+    for window_face, frame_faces in insets:
+        frame_faces.remove(get_top_faces(frame_faces).pop()) # remove top face from frame_faces
+        top_edges.append(get_top_edges({e for f in get_bottom_faces(frame_faces, n=3)[1:] for e in f.edges}, n=2))
+    return create_arches(bm, top_edges, prop.arch, prop.frame_thickness, local_xyz(insets[0][0]))
 
-    normal = face.normal.copy()
 
-    window_face, frame_faces = make_window_inset(bm, face, prop.size_offset.size, prop.frame_thickness)
-    arch_face = None
+def create_window_frame(bm, window_face, frame_faces, arch, prop):
+    """Create extrude around the inset window face to make window frame,
+       arch is the arch face and arch frame faces from create_window_arches
+    """
 
-    # create arch
-    if prop.add_arch:
-        frame_faces.remove(get_top_faces(frame_faces).pop()) # remove top face from frame_faces
-        top_edges = get_top_edges({e for f in get_bottom_faces(frame_faces, n=3)[1:] for e in f.edges}, n=2)
-        arch_face, arch_frame_faces = create_arch(bm, top_edges, frame_faces, prop.arch, prop.frame_thickness, local_xyz(face))
-        frame_faces += arch_frame_faces
+    normal = window_face.normal.copy()
+    arch_face, arch_frame_faces = arch
+    frame_faces += arch_frame_faces
 
-    bmesh.ops.recalc_face_normals(bm, faces=list(bm.faces))
+    MeshRegion(bm, [window_face, arch_face] + frame_faces).recalc_face_normals()
 
     # add depths
     if prop.add_arch:
@@ -110,29 +125,32 @@ def add_window_depth(bm, window, depth, normal):
         return window, []
 
 
-def make_window_inset(bm, face, size, frame_thickness):
-    """ Make two horizontal cuts and two vertical cuts
+def make_window_inset(bm, faces, size, frame_thickness):
+    """ Make two horizontal cuts and two vertical cuts on each face, returns
+        the window face and frame faces of each
     """
     window_width = size.x - frame_thickness * 2
     window_height = size.y - frame_thickness * 2
     # horizontal cuts
     h_widths = [frame_thickness, window_width, frame_thickness]
-    h_faces = subdivide_face_horizontally(bm, face, h_widths)
+    h_faces = subdivide_faces_horizontally(bm, faces, h_widths)
     # vertical cuts
     v_widths = [frame_thickness, window_height, frame_thickness]
-    v_faces = subdivide_face_vertically(bm, h_faces[1], v_widths)
-    return v_faces[1], h_faces[::2] + v_faces[::2]
+    v_faces = subdivide_faces_vertically(bm, [h[1] for h in h_faces], v_widths)
+    return [(v[1], h[::2] + v[::2]) for h, v in zip(h_faces, v_faces)]
 
 
-def fill_window_face(bm, face, prop):
-    """Create extra elements on face
+def fill_window_faces(bm, faces, prop):
+    """Create extra elements on faces
     """
     if prop.fill_type == "GLASS_PANES":
         add_facemap_for_groups(FaceMap.WINDOW_PANES)
-        fill_glass_panes(bm, face, prop.glass_fill, user=FillUser.WINDOW)
+        fill_glass_panes(bm, faces, prop.glass_fill, user=FillUser.WINDOW)
     elif prop.fill_type == "BAR":
         add_facemap_for_groups(FaceMap.WINDOW_BARS)
-        fill_bar(bm, face, prop.bar_fill)
+        for face in faces:
+            fill_bar(bm, face, prop.bar_fill)
     elif prop.fill_type == "LOUVER":
         add_facemap_for_groups(FaceMap.WINDOW_LOUVERS)
-        fill_louver(bm, face, prop.louver_fill, user=FillUser.WINDOW)
+        for face in faces:
+            fill_louver(bm, face, prop.louver_fill, user=FillUser.WINDOW)
@@ -3,4 +3,13 @@ from .util_common import *
 from .util_object import *
 from .util_geometry import *
 from .util_material import *
-from .util_skeleton import skeletonize
+from .util_skeleton import (
+    skeletonize,
+    skeleton_faces,
+    skeleton_arrays,
+    skeletonize_cached,
+    skeletonize_many,
+    skeletonize_footprint,
+    skeletonize_many_cached,
+    rectangle_gable_faces,
+)
@@ -1,9 +1,12 @@
 import bpy
 import bmesh
+import warnings
+import numpy as np
 from enum import Enum, auto
 from functools import wraps
+from contextlib import contextmanager
 
-from .util_mesh import get_edit_mesh
+from .util_mesh import MeshRegion, EditMeshSession
 
 
 class AutoIndex(Enum):
@@ -44,6 +47,11 @@ def map_new_faces(group, skip=None):
     """ Finds all newly created faces in a function and adds them to a face_map
         called group.name.lower()
 
+        New faces are the ones recorded in a MeshRegion while the function
+        runs, so the ops in it have to record what they create. A wrapped
+        bmesh op records its own result. When bm.faces grew by more faces
+        than were recorded, a record is missing and the function is reported.
+
         if skip is provided, then all faces in the face_map called skip.name
         will not be added to the face_map
     """
@@ -52,12 +60,17 @@ def map_new_faces(group, skip=None):
         @wraps(func)
         def wrapper(*args, **kwargs):
             bm = [arg for arg in args if isinstance(arg, bmesh.types.BMesh)].pop()
-            faces = set(bm.faces)
-
-            result = func(*args, **kwargs)
-
-            new_faces = set(bm.faces) - faces
-            add_faces_to_map(bm, list(new_faces), group, skip)
+            count = len(bm.faces)
+            with MeshRegion(bm) as region:
+                result = func(*args, **kwargs)
+                if isinstance(result, dict):
+                    MeshRegion.record(result)
+
+            faces = region.region_faces()
+            if len(bm.faces) - count > len(faces):
+                warnings.warn("{} created faces it did not record, they are not in face map {}".format(
+                    func.__name__, group.name.lower()))
+            add_faces_to_map(bm, faces, group, skip)
             return result
         return wrapper
     return outer
@@ -69,25 +82,69 @@ def add_faces_to_map(bm, faces, group, skip=None):
 
         see map_new_faces for the option *skip*
     """
+    registry = FaceMapRegistry.get(bpy.context.object)
     face_map = bm.faces.layers.face_map.active
-    group_index = face_map_index_from_name(group.name.lower())
-
-    def remove_skipped(f):
-        if skip:
-            skip_index = face_map_index_from_name(skip.name.lower())
-            return not (f[face_map] == skip_index)
-        return True
+    group_index = registry.index(group)
 
-    for face in list(filter(remove_skipped, faces)):
-        face[face_map] = group_index
+    if skip:
+        skip_index = registry.index(skip)
+        faces = [f for f in faces if f[face_map] != skip_index]
 
     # -- if the facemap already has a material assigned, assign the new faces to the material
-    obj = bpy.context.object
-    mat = obj.facemap_materials[group_index].material
-    mat_id = [idx for idx,  m in enumerate(obj.data.materials) if m == mat]
-    if mat_id:
-        for f in faces:
-            f.material_index = mat_id.pop()
+    mat_id = registry.material_slot(group)
+    if mat_id is None:
+        for face in faces:
+            face[face_map] = group_index
+    else:
+        for face in faces:
+            face[face_map] = group_index
+            face.material_index = mat_id
+
+
+class FaceMapRegistry:
+    """ Face map index and material slot of each FaceMap group of an object,
+        resolved once per operator run instead of on every add_faces_to_map
+
+        The registry is kept on the active EditMeshSession, without one every
+        get resolves them again. builders reset it through
+        verify_facemaps_for_object
+    """
+
+    def __init__(self, obj):
+        self.obj = obj
+        self.indices = {}
+        self.material_slots = {}
+
+    @classmethod
+    def get(cls, obj):
+        session = EditMeshSession.active
+        if session is None:
+            return cls(obj)
+        if session.face_maps is None or session.face_maps.obj != obj:
+            session.face_maps = cls(obj)
+        return session.face_maps
+
+    @staticmethod
+    def reset():
+        if EditMeshSession.active:
+            EditMeshSession.active.face_maps = None
+
+    def index(self, group):
+        """ Index of the face_map called group.name.lower(), -1 if missing
+        """
+        if group not in self.indices:
+            self.indices[group] = face_map_index_from_name(group.name.lower(), self.obj)
+        return self.indices[group]
+
+    def material_slot(self, group):
+        """ Material slot of the material assigned to the face_map of group
+        """
+        if group not in self.material_slots:
+            index = self.index(group)
+            mat = self.obj.facemap_materials[index].material if index >= 0 else None
+            slots = [idx for idx, m in enumerate(self.obj.data.materials) if mat and m == mat]
+            self.material_slots[group] = slots[0] if slots else None
+        return self.material_slots[group]
 
 
 def add_facemap_for_groups(groups):
@@ -97,46 +154,195 @@ def add_facemap_for_groups(groups):
     obj = bpy.context.object
     groups = groups if isinstance(groups, (list, tuple)) else [groups]
 
+    registry = FaceMapRegistry.get(obj)
     for group in groups:
         if not obj.face_maps.get(group.name.lower()):
-            obj.face_maps.new(name=group.name.lower())
+            fmap = obj.face_maps.new(name=group.name.lower())
             obj.facemap_materials.add()
+            registry.indices[group] = fmap.index
 
 
 def verify_facemaps_for_object(obj):
     """ Ensure object has a facemap layer """
-    me = get_edit_mesh()
-    bm = bmesh.from_edit_mesh(me)
-    bm.faces.layers.face_map.verify()
-    bmesh.update_edit_mesh(me, True)
+    FaceMapRegistry.reset()
+    with EditMeshSession.open(obj=obj) as session:
+        if not session.bm.faces.layers.face_map:
+            session.bm.faces.layers.face_map.verify()
+            session.modified = True
 
 
 def set_material_for_active_facemap(material, context):
     obj = context.object
     index = obj.face_maps.active_index
-    active_facemap = obj.face_maps[index]
+    set_materials_for_facemaps(obj, {index: material})
 
-    link_material(obj, material)
-    mat_id = [
-        idx for idx, mat in enumerate(obj.data.materials) if mat == material
-    ].pop()
 
-    me = get_edit_mesh()
-    bm = bmesh.from_edit_mesh(me)
+def set_materials_for_facemaps(obj, materials=None):
+    """ Assign each material in materials, a dict of face_map index to
+        material, to the faces in that face_map. Defaults to the materials of
+        all face maps in obj.facemap_materials.
 
-    face_map = bm.faces.layers.face_map.active
-    for face in bm.faces:
-        if face[face_map] == active_facemap.index:
-            face.material_index = mat_id
+        Face map and material indices are handled as numpy arrays, see
+        face_values and set_face_values for how they are read and written.
+        Large meshes leave edit mode for it, see bulk_edit_mesh
+    """
+    if bulk_edit_mesh(obj):
+        with object_mode():
+            return set_materials_for_facemaps(obj, materials)
+
+    if materials is None:
+        materials = {
+            idx: fmap_mat.material
+            for idx, fmap_mat in enumerate(obj.facemap_materials) if fmap_mat.material
+        }
+
+    # -- material slot per face_map index, the extra last slot is for faces in no face_map
+    slots = np.full(len(obj.face_maps) + 1, -1, dtype=np.int32)
+    for index, material in materials.items():
+        link_material(obj, material)
+        slots[index] = obj.data.materials.find(material.name)
+
+    face_maps = facemap_values(obj)
+    if face_maps is None:
+        return
+
+    face_maps[face_maps >= len(slots) - 1] = -1
+    material_indices = face_values(obj)
+
+    new_indices = slots[face_maps]
+    assigned = new_indices >= 0
+    material_indices[assigned] = new_indices[assigned]
+    set_face_values(obj, material_indices)
+
+
+def clear_empty_facemaps(obj):
+    """ Remove the face_maps of obj that have no faces, along with their
+        facemap_materials, and compact the face map indices of the faces
+    """
+    face_maps = facemap_values(obj)
+    if face_maps is None:
+        return
+
+    count = len(obj.face_maps)
+    used = np.unique(face_maps)
+    used = used[(used >= 0) & (used < count)]
+    if len(used) == count:
+        return
 
-    bmesh.update_edit_mesh(me, True)
+    # -- old face_map index -> new index, the extra last entry keeps -1 (no face_map) as is
+    remap = np.full(count + 1, -1, dtype=np.int32)
+    remap[used] = np.arange(len(used), dtype=np.int32)
+    face_maps[face_maps >= count] = -1
 
+    for idx in sorted(set(range(count)) - set(used.tolist()), reverse=True):
+        obj.face_maps.remove(obj.face_maps[idx])
+        obj.facemap_materials.remove(idx)
 
-def face_map_index_from_name(name):
-    for _, fmap in bpy.context.object.face_maps.items():
-        if fmap.name == name:
-            return fmap.index
-    return -1
+    # -- face_maps.remove shifts the face values one map at a time, overwrite them all at once
+    set_face_values(obj, remap[face_maps], face_map=True)
+    FaceMapRegistry.reset()
+
+
+# -- faces from which edit meshes are toggled to object mode for bulk face values
+BULK_FACES = 10000
+
+
+def bulk_edit_mesh(obj):
+    """ Whether obj is in edit mode with at least BULK_FACES faces and no open
+        EditMeshSession. Face values of an edit mesh go through python face by
+        face, for those toggling to object mode costs one conversion of the
+        mesh each way and leaves the rest to foreach_get/foreach_set
+    """
+    return (
+        obj.mode == "EDIT" and EditMeshSession.active is None
+        and len(bmesh.from_edit_mesh(obj.data).faces) >= BULK_FACES
+    )
+
+
+@contextmanager
+def object_mode():
+    """ Leave edit mode while the block runs
+    """
+    bpy.ops.object.mode_set(mode="OBJECT")
+    try:
+        yield
+    finally:
+        bpy.ops.object.mode_set(mode="EDIT")
+
+
+def facemap_values(obj):
+    """ Face map index of each face of obj as an array, None without face map layer
+    """
+    if obj.mode == "EDIT":
+        if not bmesh.from_edit_mesh(obj.data).faces.layers.face_map.active:
+            return None
+    elif not obj.data.face_maps:
+        return None
+    return face_values(obj, face_map=True)
+
+
+def face_values(obj, face_map=False):
+    """ Material index of each face of obj as an array, or its face map index
+        with face_map. In edit mode they are read face by face from the edit mesh
+    """
+    me = obj.data
+    if obj.mode == "EDIT":
+        bm = bmesh.from_edit_mesh(me)
+        if face_map:
+            layer = bm.faces.layers.face_map.active
+            values = (face[layer] for face in bm.faces)
+        else:
+            values = (face.material_index for face in bm.faces)
+        return np.fromiter(values, dtype=np.int32, count=len(bm.faces))
+
+    values = np.empty(len(me.polygons), dtype=np.int32)
+    if face_map:
+        me.face_maps.active.data.foreach_get("value", values)
+    else:
+        me.polygons.foreach_get("material_index", values)
+    return values
+
+
+def set_face_values(obj, values, face_map=False):
+    """ Write values to the material index of each face of obj, or to its face
+        map index with face_map.
+
+        In edit mode they are written through the EditMeshSession of obj, the
+        open one or a new one that skips the tessellation of its update. Each
+        write goes through python there, so only the faces whose value changed
+        are written, callers leave edit mode for large meshes first when they
+        can, see bulk_edit_mesh
+    """
+    me = obj.data
+    if obj.mode != "EDIT":
+        if face_map:
+            me.face_maps.active.data.foreach_set("value", values)
+        else:
+            me.polygons.foreach_set("material_index", values)
+        me.update()
+        return
+
+    changed = np.flatnonzero(face_values(obj, face_map) != values)
+    if not len(changed):
+        return
+
+    changes = zip(changed.tolist(), values[changed].tolist())
+    with EditMeshSession.open(loop_triangles=False, obj=obj) as session:
+        faces = session.bm.faces
+        faces.ensure_lookup_table()
+        if face_map:
+            layer = faces.layers.face_map.active
+            for idx, value in changes:
+                faces[idx][layer] = value
+        else:
+            for idx, value in changes:
+                faces[idx].material_index = value
+        session.modified = True
+
+
+def face_map_index_from_name(name, obj=None):
+    fmap = (obj or bpy.context.object).face_maps.get(name)
+    return fmap.index if fmap else -1
 
 
 def link_material(obj, mat):
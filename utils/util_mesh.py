@@ -1,11 +1,14 @@
 import bpy
 import math
 import bmesh
+import bisect
 import operator
+import itertools as it
 import functools as ft
 from mathutils import Vector
+from mathutils.kdtree import KDTree
 from bmesh.types import BMVert, BMEdge, BMFace
-from .util_common import local_xyz, equal
+from .util_common import local_xyz
 
 
 def get_edit_mesh():
@@ -14,6 +17,57 @@ def get_edit_mesh():
     return bpy.context.edit_object.data
 
 
+class EditMeshSession:
+    """ Edit mesh of the edit object, or of obj, shared by everything run in
+        one operator execute, opened sessions nest into the active one. A
+        session on another object's mesh is active until it closes, then the
+        one it was opened in is again
+
+        The edit mesh is updated once, when the outermost session closes and
+        only if it was marked modified. loop_triangles=False skips the
+        tessellation in that update.
+
+        face_maps holds the FaceMapRegistry and face_index the FaceIndex of
+        the run, both are dropped when the outermost session closes.
+    """
+
+    active = None
+
+    def __init__(self, context=None, loop_triangles=True, obj=None):
+        self.me = (obj or (context or bpy.context).edit_object).data
+        self.bm = bmesh.from_edit_mesh(self.me)
+        self.loop_triangles = loop_triangles
+        self.modified = False
+        self.face_maps = None
+        self.face_index = None
+        self.outer = None
+        self.depth = 0
+
+    @classmethod
+    def open(cls, context=None, loop_triangles=True, obj=None):
+        """ The active session, a new one if there is none or obj has another mesh
+        """
+        if cls.active and (obj is None or cls.active.me == obj.data):
+            return cls.active
+        return cls(context, loop_triangles, obj)
+
+    def __enter__(self):
+        if not self.depth:
+            self.outer = EditMeshSession.active
+            EditMeshSession.active = self
+        self.depth += 1
+        return self
+
+    def __exit__(self, *args):
+        self.depth -= 1
+        if not self.depth:
+            EditMeshSession.active, self.outer = self.outer, None
+            self.face_maps = None
+            self.face_index = None
+            if self.modified:
+                bmesh.update_edit_mesh(self.me, loop_triangles=self.loop_triangles)
+
+
 def create_mesh(name):
     """ Make new mesh data
     """
@@ -101,38 +155,31 @@ def sort_edges_clockwise(edges):
     return sorted(edges, key=sort_function, reverse=True)
 
 
-def filter_vertical_edges(edges, normal):
-    """ Determine edges that are vertical based on a normal value
+def filter_vertical_edges(edges, normal, eps=0.001):
+    """ Determine edges that are vertical based on a normal value, edges that
+        do not run sideways on the face (see face_frame)
     """
-    res = []
-    rnd = ft.partial(round, ndigits=3)
-
-    for e in edges:
-        if rnd(normal.x):
-            s = set([rnd(v.co.y) for v in e.verts])
-        else:
-            s = set([rnd(v.co.x) for v in e.verts])
-
-        if len(s) == 1:
-            res.append(e)
-    return res
+    _, right = face_frame(normal)
+    return [e for e in edges if abs((e.verts[1].co - e.verts[0].co).dot(right)) < eps]
 
 
-def filter_horizontal_edges(edges, normal):
-    """ Determine edges that are horizontal based on a normal value
+def filter_horizontal_edges(edges, normal, eps=0.001):
+    """ Determine edges that are horizontal based on a normal value, edges
+        that do not run up on the face (see face_frame)
     """
-    res = []
-    rnd = ft.partial(round, ndigits=3)
+    up, _ = face_frame(normal)
+    return [e for e in edges if abs((e.verts[1].co - e.verts[0].co).dot(up)) < eps]
 
-    for e in edges:
-        if rnd(normal.z):
-            s = set([rnd(v.co.y) for v in e.verts])
-        else:
-            s = set([rnd(v.co.z) for v in e.verts])
 
-        if len(s) == 1:
-            res.append(e)
-    return res
+def face_frame(normal):
+    """ Up and right directions on a face with normal. Up is world z projected
+        onto the face, so slanted faces work too, and world y for faces
+        pointing up or down
+    """
+    normal = Vector(normal)
+    up = Vector((0.0, 0.0, 1.0)) - normal * normal.z
+    up = up.normalized() if up.length > 0.001 else Vector((0.0, 1.0, 0.0))
+    return up, up.cross(normal)
 
 
 def filter_parallel_edges(edges, dir):
@@ -163,70 +210,190 @@ def calc_face_dimensions(face):
     return width, height
 
 
+def group_faces_by_size(faces, precision=4):
+    """ Group faces of the same width and height, returns the indices of the
+        faces in each group keyed by their size
+    """
+    groups = {}
+    for idx, face in enumerate(faces):
+        size = tuple(round(d, precision) for d in calc_face_dimensions(face))
+        groups.setdefault(size, []).append(idx)
+    return groups
+
+
 def face_with_verts(bm, verts, default=None):
     """ Find a face in the bmesh with the given verts
     """
-    for face in bm.faces:
-        equal = map(
-            operator.eq,
-            sorted(verts, key=operator.attrgetter('index')),
-            sorted(face.verts, key=operator.attrgetter('index')),
-        )
-        if len(face.verts) == len(verts) and all(equal):
-            return face
-    return default
+    return FaceIndex.get(bm).find(verts, default)
+
+
+class FaceIndex:
+    """ Faces of a bmesh keyed by the frozenset of their verts
+
+        Filled lazily from the faces linked to the verts looked up, entries
+        whose face was removed or whose verts changed are replaced on lookup.
+        The index of the edit mesh is kept on the active EditMeshSession, any
+        other bmesh gets a new one on every get
+    """
+
+    def __init__(self):
+        self.faces = {}
+
+    @classmethod
+    def get(cls, bm):
+        session = EditMeshSession.active
+        if session is None or session.bm is not bm:
+            return cls()
+        if session.face_index is None:
+            session.face_index = cls()
+        return session.face_index
+
+    def find(self, verts, default=None):
+        key = frozenset(verts)
+        if not key:
+            return default
+
+        face = self.faces.get(key)
+        if face is None or not face.is_valid or frozenset(face.verts) != key:
+            self.faces.pop(key, None)
+            for f in next(iter(key)).link_faces:
+                self.faces[frozenset(f.verts)] = f
+            face = self.faces.get(key, default)
+        return face
 
 
 def subdivide_face_horizontally(bm, face, widths):
     """ Subdivide the face horizontally, widths from left to right (face x axis)
     """
-    if len(widths) < 2:
-        return [face]
-    edges = filter_horizontal_edges(face.edges, face.normal)
-    direction, _, _ = local_xyz(face)
-    inner_edges = subdivide_edges(bm, edges, direction, widths)
-    return sort_faces(list({f for e in inner_edges for f in e.link_faces}), direction)
+    return subdivide_faces_horizontally(bm, [face], widths)[0]
 
 
 def subdivide_face_vertically(bm, face, widths):
     """ Subdivide the face vertically, widths from bottom to top (face y axis)
     """
-    if len(widths) < 2:
-        return [face]
-    edges = filter_vertical_edges(face.edges, face.normal)
-    _, direction, _ = local_xyz(face)
-    inner_edges = subdivide_edges(bm, edges, direction, widths)
-    return sort_faces(list({f for e in inner_edges for f in e.link_faces}), direction)
+    return subdivide_faces_vertically(bm, [face], widths)[0]
+
+
+def subdivide_faces_horizontally(bm, faces, widths):
+    """ Subdivide parallel faces of the same width horizontally in one pass,
+        pieces of each face from left to right (face x axis)
+    """
+    return subdivide_faces(bm, faces, widths, filter_horizontal_edges, 0)
+
+
+def subdivide_faces_vertically(bm, faces, widths):
+    """ Subdivide parallel faces of the same height vertically in one pass,
+        pieces of each face from bottom to top (face y axis)
+    """
+    return subdivide_faces(bm, faces, widths, filter_vertical_edges, 1)
+
+
+def subdivide_faces(bm, faces, widths, edge_filter, axis):
+    """ Cut all faces at widths along the axis of their local xyz, returns
+        the sorted pieces of each face
+
+        Faces are cut together in one subdivide_edges, except for faces with
+        a common neighbour across their cut edges. That neighbour would get
+        both of its sides cut and split too, so those go in separate passes.
+    """
+    if len(widths) < 2 or not faces:
+        return [[f] for f in faces]
+
+    direction = local_xyz(faces[0])[axis]
+    inputs = set(faces)
+    passes = []
+    for idx, f in enumerate(faces):
+        neighbours = {n for e in edge_filter(f.edges, f.normal) for n in e.link_faces if n not in inputs}
+        for batch, batch_neighbours in passes:
+            if not neighbours & batch_neighbours:
+                break
+        else:
+            batch, batch_neighbours = [], set()
+            passes.append((batch, batch_neighbours))
+        batch.append(idx)
+        batch_neighbours.update(neighbours)
+
+    pieces = [None] * len(faces)
+    for batch, _ in passes:
+        edges = list({e for idx in batch for e in edge_filter(faces[idx].edges, faces[idx].normal)})
+        inner_edges = set(subdivide_edges(bm, edges, direction, widths))
+        # -- each face is kept as one of its pieces, the rest are across inner edges from it
+        for idx in batch:
+            found, stack = {faces[idx]}, [faces[idx]]
+            while stack:
+                for e in stack.pop().edges:
+                    if e in inner_edges:
+                        new = [f for f in e.link_faces if f not in found]
+                        found.update(new)
+                        stack.extend(new)
+            pieces[idx] = list(found)
+    return [sort_faces(p, direction) for p in pieces]
 
 
 def subdivide_edges(bm, edges, direction, widths):
     """ Subdivide edges in a direction, widths in the direction
+
+        edges may belong to several faces, each edge is cut at the same widths
     """
     dir = direction.copy()
     cuts = len(widths) - 1
+    # -- start of each edge along dir and the even spacing of its cuts
+    spacing = {}
+    for edge in edges:
+        start, end = sorted(dir.dot(v.co) for v in edge.verts)
+        spacing[start] = (end - start) / (cuts + 1)
+    starts = sorted(spacing)
+
+    faces = {f for e in edges for f in e.link_faces}
     res = bmesh.ops.subdivide_edges(bm, edges=edges, cuts=cuts)
     inner_edges = filter_geom(res.get("geom_inner"), BMEdge)
+    # -- each split face is kept as one of its pieces, the others are new
+    MeshRegion.record(res["geom_inner"] + res["geom_split"])
+    MeshRegion.record({f for e in inner_edges for f in e.link_faces} - faces)
+
+    # -- cuts are spaced evenly, move each to the sum of the widths before it
     distance = sum(widths)/len(widths)
-    final_position = 0.0
-    for i, edge in enumerate(sort_edges(inner_edges, dir)):
-        original_position = (i+1) * distance
-        final_position += widths[i]
-        diff = final_position - original_position
-        bmesh.ops.translate(bm, verts=edge.verts, vec=diff*dir)
+    offsets = [
+        (position - (i+1) * distance) * dir
+        for i, position in enumerate(it.accumulate(widths[:cuts]))
+    ]
+    for v in {v for e in inner_edges for v in e.verts}:
+        position = dir.dot(v.co)
+        start = starts[max(bisect.bisect_right(starts, position + 0.0001) - 1, 0)]
+        cut = round((position - start) / spacing[start]) - 1 if spacing[start] else 0
+        v.co += offsets[min(max(cut, 0), cuts - 1)]
     return inner_edges
 
 
-def arc_edge(bm, edge, resolution, height, offset, xyz, function="SPHERE"):
-    """ Subdivide the given edge and offset vertices to form an arc
-    """
-    length = edge.calc_length()
-    median = calc_edge_median(edge)
+def arc_edges(bm, edges, resolution, height, xyz, function="SPHERE"):
+    """ Subdivide the given edges in one pass and offset the vertices of each
+        to form an arc, returns the edges of each arc in order along it
 
-    ret = bmesh.ops.subdivide_edges(bm, edges=[edge], cuts=resolution)
-    verts = sort_verts(
-        list({v for e in filter_geom(ret["geom_split"], bmesh.types.BMEdge) for v in e.verts}),
-        xyz[0]
-    )
+        No two edges may border the same face, subdivide_edges would split
+        that face between them
+    """
+    spans = [(e.verts[0], e.verts[1], e.calc_length(), calc_edge_median(e)) for e in edges]
+
+    ret = bmesh.ops.subdivide_edges(bm, edges=edges, cuts=resolution)
+    MeshRegion.record(ret["geom_inner"] + ret["geom_split"])
+    split_edges = set(filter_geom(ret["geom_split"], BMEdge))
+
+    arcs = []
+    for start, end, length, median in spans:
+        # -- walk the pieces of the edge from one end to the other
+        verts, arc = [start], []
+        while verts[-1] is not end:
+            edge = next(e for e in verts[-1].link_edges if e in split_edges and e not in arc[-1:])
+            arc.append(edge)
+            verts.append(edge.other_vert(verts[-1]))
+        arc_verts(sort_verts(verts, xyz[0]), length, median, height, xyz, function)
+        arcs.append(arc)
+    return arcs
+
+
+def arc_verts(verts, length, median, height, xyz, function="SPHERE"):
+    """ Offset verts, sorted along the edge they were cut from, to form an arc
+    """
     theta = math.pi / (len(verts) - 1)
 
     def arc_sine(verts):
@@ -240,7 +407,6 @@ def arc_edge(bm, edge, resolution, height, offset, xyz, function="SPHERE"):
             v.co.z += math.sin(angle) * height
 
     {"SINE": arc_sine, "SPHERE": arc_sphere}.get(function)(verts)
-    return ret
 
 
 def extrude_face(bm, face, extrude_depth):
@@ -249,6 +415,7 @@ def extrude_face(bm, face, extrude_depth):
     extruded_face = bmesh.ops.extrude_discrete_faces(bm, faces=[face]).get("faces")[0]
     bmesh.ops.translate(bm, verts=extruded_face.verts, vec=extruded_face.normal * extrude_depth)
     surrounding_faces = list({f for edge in extruded_face.edges for f in edge.link_faces if f not in [extruded_face]})
+    MeshRegion.record([extruded_face] + surrounding_faces)
     return extruded_face, surrounding_faces
 
 
@@ -256,7 +423,7 @@ def extrude_face_region(bm, faces, depth, normal):
     """extrude a face and delete redundant faces
     """
     initial_locations = [f.calc_center_bounds() for f in faces]
-    geom = bmesh.ops.extrude_face_region(bm, geom=faces).get("geom")
+    geom = MeshRegion.record(bmesh.ops.extrude_face_region(bm, geom=faces)).get("geom")
     verts = filter_geom(geom, BMVert)
     bmesh.ops.translate(bm, verts=verts, vec=normal * depth)
 
@@ -267,24 +434,33 @@ def extrude_face_region(bm, faces, depth, normal):
     final_locations = [loc+depth*normal for loc in initial_locations]
     extruded_faces = closest_faces(extruded_faces, final_locations)
     surrounding_faces = list({f for edge in filter_geom(geom, BMEdge) for f in edge.link_faces if f not in extruded_faces})
+    MeshRegion.record(surrounding_faces)
     return extruded_faces, surrounding_faces
 
 
-def closest_faces(faces, locations):
-    def get_face(faces, location):
-        for f in faces:
-            if equal((f.calc_center_bounds()-location).length, 0):
-                return f
-    return [get_face(faces, l) for l in locations]
+def closest_faces(faces, locations, eps=0.001):
+    """ Face whose center is at each of locations (within eps), None if there is none
+    """
+    tree = KDTree(len(faces))
+    for idx, f in enumerate(faces):
+        tree.insert(f.calc_center_bounds(), idx)
+    tree.balance()
+
+    def get_face(location):
+        _, idx, dist = tree.find(location)
+        if idx is not None and dist <= eps:
+            return faces[idx]
+
+    return [get_face(l) for l in locations]
 
 
 def get_selected_face_dimensions(context):
     """ Get dimensions of selected face
     """
-    bm = bmesh.from_edit_mesh(context.edit_object.data)
-    wall = [f for f in bm.faces if f.select]
-    if wall:
-        return calc_face_dimensions(wall[0])
+    with EditMeshSession.open(context) as session:
+        wall = [f for f in session.bm.faces if f.select]
+        if wall:
+            return calc_face_dimensions(wall[0])
     return 1, 1
 
 
@@ -298,7 +474,7 @@ def create_face(bm, size, offset, xyz):
     v3 = bmesh.ops.create_vert(bm, co=offset-size.x*xyz[0]/2+size.y*xyz[1]/2)["vert"][0]
     v4 = bmesh.ops.create_vert(bm, co=offset-size.x*xyz[0]/2-size.y*xyz[1]/2)["vert"][0]
 
-    return bmesh.ops.contextual_create(bm, geom=[v1, v2, v3, v4])["faces"][0]
+    return MeshRegion.record(bmesh.ops.contextual_create(bm, geom=[v1, v2, v3, v4]))["faces"][0]
 
 
 def get_top_edges(edges, n=1):
@@ -327,3 +503,107 @@ def sort_edges(edges, direction):
 
 def sort_verts(verts, direction):
     return sorted(verts, key=lambda v: direction.dot(v.co))
+
+
+def face_islands(faces):
+    """ Group faces into islands of faces connected by their edges
+    """
+    order = {f: i for i, f in enumerate(faces)}
+    remaining, islands = dict(order), []
+    while remaining:
+        face = next(iter(remaining))
+        del remaining[face]
+        stack, island = [face], [face]
+        while stack:
+            for e in stack.pop().edges:
+                for f in e.link_faces:
+                    if f in remaining:
+                        del remaining[f]
+                        stack.append(f)
+                        island.append(f)
+        islands.append(sorted(island, key=order.get))
+    return islands
+
+
+class MeshRegion:
+    """ Context that collects the geometry created by the ops run inside it,
+    so that passes like recalc_face_normals and remove_doubles only touch the
+    region a builder worked on instead of the whole mesh, and map_new_faces
+    finds the faces a builder created without going over bm.faces
+
+        with MeshRegion(bm) as region:
+            ret = MeshRegion.record(bmesh.ops.inset_region(bm, faces=faces))
+        region.remove_doubles(dist=0.0001)
+    """
+
+    active = []
+
+    def __init__(self, bm, geom=()):
+        self.bm = bm
+        self.faces = {}
+        self.verts = {}
+        self.add(geom)
+
+    def __enter__(self):
+        MeshRegion.active.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        MeshRegion.active.remove(self)
+
+    @staticmethod
+    def record(result):
+        """ Add the geometry of result, elements or the dict returned by a
+        bmesh op, to every active region and return result. Only record new
+        geometry, faces recorded here are taken as new by map_new_faces
+        """
+        if MeshRegion.active:
+            geom = result
+            if isinstance(result, dict):
+                geom = [el for value in result.values() if isinstance(value, list) for el in value]
+            for region in MeshRegion.active:
+                region.add(geom)
+        return result
+
+    def add(self, geom):
+        """ Add the faces, edges and verts in geom to the region
+        """
+        for el in geom:
+            if isinstance(el, BMFace):
+                self.faces[el] = None
+            elif isinstance(el, BMEdge):
+                self.verts.update(dict.fromkeys(el.verts))
+            elif isinstance(el, BMVert):
+                self.verts[el] = None
+
+    def region_faces(self):
+        return validate(self.faces)
+
+    def region_verts(self):
+        verts = dict.fromkeys(validate(self.verts))
+        verts.update(dict.fromkeys(v for f in self.region_faces() for v in f.verts))
+        return list(verts)
+
+    def recalc_face_normals(self):
+        """ Make the normals of the region consistent with each other and with
+        the faces around it, which keep their own normals
+        """
+        faces = self.region_faces()
+        region = set(faces)
+        for island in face_islands(faces):
+            ring = list({f for face in island for e in face.edges for f in e.link_faces} - region)
+            normals = [f.normal.copy() for f in ring]
+            bmesh.ops.recalc_face_normals(self.bm, faces=island + ring)
+
+            # -- recalc guesses the outside of an open island, the faces around
+            # it already had it right before
+            flipped = [f for f, n in zip(ring, normals) if f.normal.dot(n) < 0]
+            if len(flipped) * 2 > len(ring):
+                bmesh.ops.reverse_faces(self.bm, faces=island)
+            if flipped:
+                bmesh.ops.reverse_faces(self.bm, faces=flipped)
+
+    def remove_doubles(self, dist):
+        """ Merge the verts of the region that are closer than dist
+        """
+        bmesh.ops.remove_doubles(self.bm, verts=self.region_verts(), dist=dist)
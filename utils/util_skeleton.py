@@ -3,9 +3,20 @@
 
 import math
 import heapq
+import bisect
+import pickle
 import operator
 import itertools as it
-from collections import namedtuple
+from array import array
+from collections import namedtuple, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+try:
+    import numpy as np
+except ImportError:
+    # -- numpy ships with blender, but the module also runs without it
+    np = None
 
 
 class Vector2:
@@ -21,6 +32,10 @@ class Vector2:
 
     copy = __copy__
 
+    def __reduce__(self):
+        # -- __getattr__ swizzles would recurse on the default slot pickling
+        return self.__class__, (self.x, self.y)
+
     def __repr__(self):
         return "Vector2(%.2f, %.2f)" % (self.x, self.y)
 
@@ -190,6 +205,8 @@ class Vector2:
 
 
 class Geometry:
+    __slots__ = ()
+
     def _connect_unimplemented(self, other):
         raise AttributeError(
             "Cannot connect %s to %s" % (self.__class__, other.__class__)
@@ -235,6 +252,30 @@ def _intersect_line2_line2(A, B):
     return Point2(A.p.x + ua * A.v.x, A.p.y + ua * A.v.y)
 
 
+def _intersect_lines(A, B):
+    """ Same as Line2(B).intersect(Line2(A)), without copying A and B
+    """
+    d = B.v.y * A.v.x - B.v.x * A.v.y
+    if d == 0:
+        return None
+
+    dy = A.p.y - B.p.y
+    dx = A.p.x - B.p.x
+    ua = (B.v.x * dy - B.v.y * dx) / d
+    return Point2(A.p.x + ua * A.v.x, A.p.y + ua * A.v.y)
+
+
+def _distance_to_line(P, L):
+    """ Same as Line2(L).distance(P), without creating intermediate geometry
+    """
+    d = L.v.magnitude_squared()
+    assert d != 0
+    u = ((P.x - L.p.x) * L.v.x + (P.y - L.p.y) * L.v.y) / d
+    dx = L.p.x + u * L.v.x - P.x
+    dy = L.p.y + u * L.v.y - P.y
+    return math.sqrt(dx ** 2 + dy ** 2)
+
+
 def _connect_point2_line2(P, L):
     d = L.v.magnitude_squared()
     assert d != 0
@@ -271,6 +312,8 @@ def _connect_line2_line2(A, B):
 
 
 class Point2(Vector2, Geometry):
+    __slots__ = ()
+
     def __repr__(self):
         return "Point2(%.2f, %.2f)" % (self.x, self.y)
 
@@ -283,7 +326,7 @@ class Point2(Vector2, Geometry):
             return self.x == other.x and self.y == other.y
 
     def __hash__(self):
-        return hash(repr(self))
+        return hash((self.x, self.y))
 
     def intersect(self, other):
         return other._intersect_point2(self)
@@ -373,6 +416,8 @@ class Line2(Geometry):
 
 
 class Ray2(Line2):
+    __slots__ = ()
+
     def __repr__(self):
         return "Ray2(<%.2f, %.2f> + u<%.2f, %.2f>)" % (
             self.p.x,
@@ -386,6 +431,8 @@ class Ray2(Line2):
 
 
 class LineSegment2(Line2):
+    __slots__ = ()
+
     def __repr__(self):
         return "LineSegment2(<%.2f, %.2f> to <%.2f, %.2f>)" % (
             self.p.x,
@@ -424,6 +471,31 @@ def cross(a, b):
     return res
 
 
+def _unit(x, y):
+    d = math.sqrt(x ** 2 + y ** 2)
+    if d:
+        return x / d, y / d
+    return x, y
+
+
+def unit_cross(ax, ay, bx, by):
+    """ Same as cross(a.normalized(), b.normalized()) for a = (ax, ay) and
+    b = (bx, by), without creating any vectors
+    """
+    ax, ay = _unit(ax, ay)
+    bx, by = _unit(bx, by)
+    return ax * by - bx * ay
+
+
+def unit_dot(ax, ay, bx, by):
+    """ Same as a.normalized().dot(b.normalized()) for a = (ax, ay) and
+    b = (bx, by), without creating any vectors
+    """
+    ax, ay = _unit(ax, ay)
+    bx, by = _unit(bx, by)
+    return ax * bx + ay * by
+
+
 def approximately_equals(a, b):
     return a == b or (abs(a - b) <= max(abs(a), abs(b)) * 0.001)
 
@@ -445,7 +517,7 @@ def normalize_contour(contour):
     ]
 
 
-# -- Event Type (etype) is 1
+# -- Event Type (etype) is 0
 class SplitEvent(
     namedtuple("SplitEvent", "distance intersection_point etype vertex opposite_edge")
 ):
@@ -457,7 +529,7 @@ class SplitEvent(
         )
 
 
-# -- Event Type (etype) is 0
+# -- Event Type (etype) is 1
 class EdgeEvent(
     namedtuple("EdgeEvent", "distance intersection_point etype vertex_a vertex_b")
 ):
@@ -473,6 +545,139 @@ OriginalEdge = namedtuple("_OriginalEdge", "edge bisector_left, bisector_right")
 
 Subtree = namedtuple("Subtree", "source, height, sinks")
 
+SkeletonArrays = namedtuple("SkeletonArrays", "x y height edges")
+
+
+class EdgeIndex:
+    """ Bounding volume hierarchy over the original edges of a SLAV.
+
+    A split event on an original edge lies in the region bounded by the edge
+    and its two bisectors. Up to a height h above the edge, that region is
+    contained in the hull of the edge end points and the points at height h
+    along each bisector. Every node keeps the bounds of the end points and of
+    the bisector directions (scaled to rise one unit above their edge), which
+    gives a box for any height, so edges can be visited in order of how soon a
+    bisector ray could reach them.
+    """
+
+    LEAF_SIZE = 8
+    EPSILON = 1e-9
+
+    def __init__(self, original_edges):
+        self._edges = original_edges
+        self._bounds = [None] * len(original_edges)
+        self._unbounded = []
+
+        items = []
+        for idx, edge in enumerate(original_edges):
+            seg = edge.edge
+            x1, y1 = seg.p.x, seg.p.y
+            x2, y2 = x1 + seg.v.x, y1 + seg.v.y
+            u1 = self._unit_rise(seg, edge.bisector_left)
+            u2 = self._unit_rise(seg, edge.bisector_right)
+            if u1 is None or u2 is None:
+                # -- bisector does not rise above the edge, always visit it
+                self._unbounded.append(idx)
+                continue
+            bounds = (
+                min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2),
+                min(u1[0], u2[0]), min(u1[1], u2[1]),
+                max(u1[0], u2[0]), max(u1[1], u2[1]),
+            )
+            self._bounds[idx] = bounds
+            items.append((idx, bounds))
+
+        self._root = self._build(items) if items else None
+        if self._root:
+            xmin, ymin, xmax, ymax = self._root[0][:4]
+            self._slack = self.EPSILON * (1.0 + max(xmax - xmin, ymax - ymin))
+
+    @classmethod
+    def _unit_rise(cls, segment, bisector):
+        """ Direction of bisector scaled to rise one unit above segment
+        """
+        e = segment.v.normalized()
+        d = bisector.v.normalized()
+        rise = d.x * e.y - d.y * e.x
+        if rise <= cls.EPSILON:
+            return None
+        return d.x / rise, d.y / rise
+
+    def _build(self, items):
+        bounds = tuple(
+            agg(b[i] for _, b in items)
+            for i, agg in enumerate((min, min, max, max, min, min, max, max))
+        )
+        if len(items) <= self.LEAF_SIZE:
+            return bounds, None, items
+
+        axis = 0 if bounds[2] - bounds[0] >= bounds[3] - bounds[1] else 1
+        items = sorted(items, key=lambda item: item[1][axis] + item[1][axis + 2])
+        mid = len(items) // 2
+        return bounds, (self._build(items[:mid]), self._build(items[mid:])), None
+
+    def _reach(self, bounds, origin, direction, height, slope):
+        """ Smallest distance s along the ray at which the point lies inside
+        the box of bounds grown to height + slope * s, None if it never does
+        """
+        s_min, s_max = 0.0, math.inf
+        eps = self._slack
+        for axis in (0, 1):
+            o, d = origin[axis], direction[axis]
+            lo, hi = bounds[axis], bounds[axis + 2]
+            u_lo, u_hi = min(bounds[axis + 4], 0.0), max(bounds[axis + 6], 0.0)
+            # -- lo + u_lo * (height + slope * s) <= o + d * s <= hi + u_hi * (height + slope * s)
+            for a, b in (
+                (u_lo * slope - d, o - lo - u_lo * height + eps),
+                (d - u_hi * slope, hi + u_hi * height + eps - o),
+            ):
+                if a > 0:
+                    s_max = min(s_max, b / a)
+                elif a < 0:
+                    s_min = max(s_min, b / a)
+                elif b < 0:
+                    return None
+            if s_min > s_max:
+                return None
+        return s_min
+
+    def nearest(self, origin, direction, height, slope):
+        """ Yield (distance, index, original edge) in increasing order of the
+        distance along the ray from origin at which the edge could be split.
+
+        A point at distance s along the ray may split an edge no higher than
+        height + slope * s above it.
+        """
+        for idx in self._unbounded:
+            yield 0.0, idx, self._edges[idx]
+        if self._root is None:
+            return
+
+        origin = origin.x, origin.y
+        direction = direction.x, direction.y
+        counter = it.count()
+        queue = []
+
+        def push(bounds, node, idx):
+            s = self._reach(bounds, origin, direction, height, slope)
+            if s is not None:
+                heapq.heappush(queue, (s, next(counter), node, idx))
+
+        push(self._root[0], self._root, None)
+        while queue:
+            s, _, node, idx = heapq.heappop(queue)
+            if node is None:
+                yield s, idx, self._edges[idx]
+                continue
+
+            _, children, items = node
+            if children:
+                for child in children:
+                    push(child[0], child, None)
+            else:
+                for item_idx, bounds in items:
+                    push(bounds, None, item_idx)
+
 
 class LAVertex:
     def __init__(self, point, edge_left, edge_right, direction_vectors=None):
@@ -483,6 +688,7 @@ class LAVertex:
         self.next = None
         self.lav = None
         self._valid = True
+        self._edge_keys = None
         # this should be handled better. Maybe membership in lav implies validity?
 
         creator_vectors = (edge_left.v.normalized() * -1, edge_right.v.normalized())
@@ -506,22 +712,63 @@ class LAVertex:
     def original_edges(self):
         return self.lav._slav._original_edges
 
-    def next_event(self):
+    @property
+    def edge_index(self):
+        return self.lav._slav._edge_index
+
+    def split_bounds(self):
+        """ Unit bisector direction, height and slope such that a split point
+        at distance s along the bisector is at most height + slope * s above
+        the edge it splits
+        """
+        # -- a split point is as far from the opposite edge as from the edges
+        # of this vertex, which bounds how high above the opposite edge it is
+        direction = self.bisector.v.normalized()
+        height = slope = 0.0
+        for edge in (self.edge_left, self.edge_right):
+            e = edge.v.normalized()
+            height = max(height, abs(cross(e, self.point - edge.p)))
+            slope = max(slope, abs(cross(direction, e)))
+        return direction, height, slope
+
+    def split_candidates(self):
+        """ Original edges as (distance, index, edge), in order of the distance
+        along the bisector at which they could first be split
+        """
+        return self.edge_index.nearest(self.point, *self.split_bounds())
+
+    def next_event(self, candidates=None):
+        """ Closest event of this vertex, split events are searched for on
+        candidates (see split_candidates) when given
+        """
         events = []
+        i_prev = self.bisector.intersect(self.prev.bisector)
+        i_next = self.bisector.intersect(self.next.bisector)
+
         if self.is_reflex:
-            for edge in self.original_edges:
+            # -- only the closest event is kept, so stop once the remaining
+            # edges cannot be split before the closest event found so far
+            closest = min(
+                (abs(i - self.point) for i in (i_prev, i_next) if i is not None),
+                default=math.inf,
+            )
+            split_events = []
+            lv, rv = self.edge_left.v, self.edge_right.v
+            if candidates is None:
+                candidates = self.split_candidates()
+            for reach, index, edge in candidates:
+                if reach > closest * (1.0 + EdgeIndex.EPSILON):
+                    break
+
                 if edge.edge == self.edge_left or edge.edge == self.edge_right:
                     continue
 
-                leftdot = abs(
-                    self.edge_left.v.normalized().dot(edge.edge.v.normalized())
-                )
-                rightdot = abs(
-                    self.edge_right.v.normalized().dot(edge.edge.v.normalized())
-                )
+                ep, ev = edge.edge.p, edge.edge.v
+                leftdot = abs(unit_dot(lv.x, lv.y, ev.x, ev.y))
+                rightdot = abs(unit_dot(rv.x, rv.y, ev.x, ev.y))
                 selfedge = self.edge_left if leftdot < rightdot else self.edge_right
 
-                i = Line2(selfedge).intersect(Line2(edge.edge))
+                i = _intersect_lines(edge.edge, selfedge)
                 if i is not None and not approximately_equals(i, self.point):
                     # locate candidate b
                     linvec = (self.point - i).normalized()
@@ -538,34 +785,23 @@ class LAVertex:
                     if b is None:
                         continue
 
-                    xleft = (
-                        cross(
-                            edge.bisector_left.v.normalized(),
-                            (b - edge.bisector_left.p).normalized(),
-                        )
-                        > 0
-                    )
-                    xright = (
-                        cross(
-                            edge.bisector_right.v.normalized(),
-                            (b - edge.bisector_right.p).normalized(),
-                        )
-                        < 0
-                    )
-                    xedge = (
-                        cross(edge.edge.v.normalized(), (b - edge.edge.p).normalized())
-                        < 0
-                    )
+                    bl, br = edge.bisector_left, edge.bisector_right
+                    xleft = unit_cross(bl.v.x, bl.v.y, b.x - bl.p.x, b.y - bl.p.y) > 0
+                    xright = unit_cross(br.v.x, br.v.y, b.x - br.p.x, b.y - br.p.y) < 0
+                    xedge = unit_cross(ev.x, ev.y, b.x - ep.x, b.y - ep.y) < 0
 
                     if not (xleft and xright and xedge):
                         continue
 
-                    events.append(
-                        SplitEvent(Line2(edge.edge).distance(b), b, 0, self, edge.edge)
+                    distance = _distance_to_line(b, edge.edge)
+                    split_events.append(
+                        (index, SplitEvent(distance, b, 0, self, edge.edge))
                     )
+                    closest = min(closest, abs(b - self.point))
 
-        i_prev = self.bisector.intersect(self.prev.bisector)
-        i_next = self.bisector.intersect(self.next.bisector)
+            # -- keep the order of the exhaustive search for ties
+            split_events.sort(key=operator.itemgetter(0))
+            events.extend(event for _, event in split_events)
 
         if i_prev is not None:
             events.append(
@@ -622,6 +858,8 @@ class SLAV:
         contours = [normalize_contour(polygon)]
         contours.extend([normalize_contour(hole) for hole in holes])
 
+        # live vertices keyed by the edge on their left and on their right
+        self._vertices_by_edge = ({}, {})
         self._lavs = [LAV.from_polygon(contour, self) for contour in contours]
 
         # store original polygon edges for calculating split events
@@ -633,6 +871,7 @@ class SLAV:
             )
             for vertex in it.chain.from_iterable(self._lavs)
         ]
+        self._edge_index = EdgeIndex(self._original_edges)
 
     def __iter__(self):
         for lav in self._lavs:
@@ -644,6 +883,59 @@ class SLAV:
     def empty(self):
         return len(self._lavs) == 0
 
+    @staticmethod
+    def _edge_key(edge):
+        """ Key under which edges on the same original edge compare equal
+        """
+        norm = edge.v.normalized()
+        return edge.p.x, edge.p.y, norm.x, norm.y
+
+    def register(self, vertex):
+        """ Add vertex to the edge lookup used by split events
+        """
+        if vertex._edge_keys is not None:
+            return
+        keys = self._edge_key(vertex.edge_left), self._edge_key(vertex.edge_right)
+        for lookup, key in zip(self._vertices_by_edge, keys):
+            lookup.setdefault(key, {})[vertex] = None
+        vertex._edge_keys = keys
+
+    def unregister(self, vertex):
+        """ Remove vertex from the edge lookup used by split events
+        """
+        if vertex._edge_keys is None:
+            return
+        for lookup, key in zip(self._vertices_by_edge, vertex._edge_keys):
+            lookup[key].pop(vertex, None)
+        vertex._edge_keys = None
+
+    def vertices_on_edge(self, edge):
+        """ Adjacent live vertices (left, right) whose shared edge lies on edge,
+            each pair once. A vertex with both edges on edge only gives the
+            pair on its left, like the LAV walk in _first_in_lav_order.
+        """
+        key = self._edge_key(edge)
+        by_left, by_right = self._vertices_by_edge
+        pairs = {(v.prev, v): None for v in by_left.get(key, ())}
+        for v in by_right.get(key, ()):
+            if v._edge_keys[0] != key:
+                pairs[(v, v.next)] = None
+        return list(pairs)
+
+    def _first_in_lav_order(self, edge, pairs):
+        """ The one of pairs that a walk over all LAVs reaches first
+        """
+        key = self._edge_key(edge)
+        for v in it.chain.from_iterable(self._lavs):
+            if v._edge_keys[0] == key:
+                pair = v.prev, v
+            elif v._edge_keys[1] == key:
+                pair = v, v.next
+            else:
+                continue
+            if pair in pairs:
+                return pair
+
     def handle_edge_event(self, event):
         sinks = []
         events = []
@@ -674,45 +966,20 @@ class SLAV:
         vertices = []
         x = None  # right vertex
         y = None  # left vertex
-        norm = event.opposite_edge.v.normalized()
-        for v in it.chain.from_iterable(self._lavs):
-            if (
-                norm == v.edge_left.v.normalized()
-                and event.opposite_edge.p == v.edge_left.p
-            ):
-                x = v
-                y = x.prev
-            elif (
-                norm == v.edge_right.v.normalized()
-                and event.opposite_edge.p == v.edge_right.p
-            ):
-                y = v
-                x = y.next
-
-            if x:
-                xleft = (
-                    cross(
-                        y.bisector.v.normalized(),
-                        (event.intersection_point - y.point).normalized(),
-                    )
-                    >= 0
-                )
-                xright = (
-                    cross(
-                        x.bisector.v.normalized(),
-                        (event.intersection_point - x.point).normalized(),
-                    )
-                    <= 0
-                )
+        ip = event.intersection_point
+        pairs = []
+        for y, x in self.vertices_on_edge(event.opposite_edge):
+            yv, xv = y.bisector.v, x.bisector.v
+            xleft = unit_cross(yv.x, yv.y, ip.x - y.point.x, ip.y - y.point.y) >= 0
+            xright = unit_cross(xv.x, xv.y, ip.x - x.point.x, ip.y - x.point.y) <= 0
 
-                if xleft and xright:
-                    break
-                else:
-                    x = None
-                    y = None
+            if xleft and xright:
+                pairs.append((y, x))
 
-        if x is None:
+        if not pairs:
             return (None, [])
+        # -- several candidates, take the one a walk over the LAVs finds first
+        y, x = pairs[0] if len(pairs) == 1 else self._first_in_lav_order(event.opposite_edge, pairs)
 
         v1 = LAVertex(
             event.intersection_point, event.vertex.edge_left, event.opposite_edge
@@ -774,6 +1041,7 @@ class LAV:
                 point, LineSegment2(prev, point), LineSegment2(point, next)
             )
             vertex.lav = lav
+            slav.register(vertex)
             if lav.head is None:
                 lav.head = vertex
                 vertex.prev = vertex.next = vertex
@@ -791,6 +1059,7 @@ class LAV:
         for vertex in lav:
             lav._len += 1
             vertex.lav = lav
+            slav.register(vertex)
         return lav
 
     def invalidate(self, vertex):
@@ -799,6 +1068,7 @@ class LAV:
         if self.head == vertex:
             self.head = self.head.next
         vertex.lav = None
+        self._slav.unregister(vertex)
 
     def unify(self, vertex_a, vertex_b, point):
         replacement = LAVertex(
@@ -808,6 +1078,7 @@ class LAV:
             (vertex_b.bisector.v.normalized(), vertex_a.bisector.v.normalized()),
         )
         replacement.lav = self
+        self._slav.register(replacement)
 
         if self.head in [vertex_a, vertex_b]:
             self.head = replacement
@@ -850,29 +1121,160 @@ class LAV:
 
 
 class EventQueue:
+    """ Priority queue of skeleton events.
+
+    Events are stored behind (distance, point, etype, vertex, sequence)
+    keys, vertex being the first vertex of the event, so heapq never compares
+    the events themselves. Ties are broken as comparing the event tuples did:
+    points and vertices only order by x, polyskel relies on handling
+    coincident events in that order. Events whose vertices were invalidated
+    after they were queued are stale and are dropped lazily when they reach
+    the top.
+    """
+
     def __init__(self):
         self.__data = []
+        self.__sequence = it.count()
+        self.pushes = 0
+        self.pops = 0
+        self.stale = 0
 
     def put(self, item):
         if item is not None:
-            heapq.heappush(self.__data, item)
+            # -- item[3] is vertex_a of edge events, vertex of split events
+            key = (item.distance, item.intersection_point, item.etype, item[3])
+            heapq.heappush(self.__data, key + (next(self.__sequence), item))
+            self.pushes += 1
 
     def put_all(self, iterable):
         for item in iterable:
-            heapq.heappush(self.__data, item)
+            self.put(item)
 
     def get(self):
-        return heapq.heappop(self.__data)
+        self._drop_stale()
+        self.pops += 1
+        return heapq.heappop(self.__data)[-1]
 
     def empty(self):
+        self._drop_stale()
         return len(self.__data) == 0
 
     def peek(self):
-        return self.__data[0]
+        self._drop_stale()
+        return self.__data[0][-1]
 
     def show(self):
         for item in self.__data:
-            print(item)
+            print(item[-1])
+
+    def _drop_stale(self):
+        data = self.__data
+        while data and is_stale(data[0][-1]):
+            heapq.heappop(data)
+            self.stale += 1
+
+
+def is_stale(event):
+    """ Whether a vertex of event was consumed by an earlier event
+    """
+    if isinstance(event, EdgeEvent):
+        return not (event.vertex_a.is_valid and event.vertex_b.is_valid)
+    return not event.vertex.is_valid
+
+
+BATCH_THRESHOLD = 64
+
+
+def _shortlist_split_edges(vertices, edge_index, block_size=256 * 1024):
+    """ For each reflex vertex, the original edges whose split region its
+    bisector may reach before its closest edge event, as (reach, index, edge)
+    candidates for next_event in increasing order of reach.
+
+    This is EdgeIndex.nearest for all vertices at once, evaluated on the
+    bounds of every edge instead of walking the hierarchy. Whether a pair
+    really makes a split event is left to next_event.
+    """
+    original_edges = edge_index._edges
+
+    # -- per edge: index bounds, unbounded edges always reach
+    unbounded = (-np.inf, -np.inf, np.inf, np.inf, 0.0, 0.0, 0.0, 0.0)
+    e = np.array([bounds or unbounded for bounds in edge_index._bounds]).T
+
+    # -- per vertex: ray, reach bound parameters and closest edge event
+    rows = []
+    for vertex in vertices:
+        direction, height, slope = vertex.split_bounds()
+        closest = min(
+            (
+                abs(i - vertex.point)
+                for i in (
+                    vertex.bisector.intersect(vertex.prev.bisector),
+                    vertex.bisector.intersect(vertex.next.bisector),
+                )
+                if i is not None
+            ),
+            default=math.inf,
+        )
+        rows.append(
+            (vertex.point.x, vertex.point.y, direction.x, direction.y, height, slope, closest)
+        )
+    v = np.array(rows).T
+
+    eps = edge_index._slack
+    shortlist = {}
+    step = max(1, block_size // len(original_edges))
+    for start in range(0, len(vertices), step):
+        # -- EdgeIndex._reach for every pair in the block
+        ox, oy, dx, dy, height, slope, closest = v[:, start:start + step, None]
+        s_min = np.zeros((ox.shape[0], len(original_edges)))
+        s_max = np.full_like(s_min, np.inf)
+        never = np.zeros(s_min.shape, dtype=bool)
+        for o, d, lo, hi, u_lo, u_hi in (
+            (ox, dx, e[0], e[2], np.minimum(e[4], 0.0), np.maximum(e[6], 0.0)),
+            (oy, dy, e[1], e[3], np.minimum(e[5], 0.0), np.maximum(e[7], 0.0)),
+        ):
+            for a, b in (
+                (u_lo * slope - d, o - lo - u_lo * height + eps),
+                (d - u_hi * slope, hi + u_hi * height + eps - o),
+            ):
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    ratio = b / a
+                s_max = np.where(a > 0, np.minimum(s_max, ratio), s_max)
+                s_min = np.where(a < 0, np.maximum(s_min, ratio), s_min)
+                never |= (a == 0) & (b < 0)
+        never |= s_min > s_max
+        # -- next_event stops at the first edge beyond its closest event
+        keep = ~never & (s_min <= closest * (1.0 + EdgeIndex.EPSILON))
+        for row, (reach, mask) in enumerate(zip(s_min, keep)):
+            idx = np.flatnonzero(mask)
+            idx = idx[np.argsort(reach[idx], kind="stable")]
+            # -- lazily, next_event usually stops well before the last one
+            idx = idx.tolist()
+            shortlist[vertices[start + row]] = zip(
+                reach[idx].tolist(), idx, map(original_edges.__getitem__, idx)
+            )
+    return shortlist
+
+
+def initial_events(slav):
+    """ First event of every vertex in slav.
+
+    For larger polygons the split event candidates of all reflex vertices are
+    shortlisted in one NumPy pass before each vertex picks its event.
+    """
+    vertices = list(it.chain.from_iterable(slav))
+    reflex = [v for v in vertices if v.is_reflex]
+
+    shortlist = {}
+    if np is not None and reflex and len(slav._original_edges) >= BATCH_THRESHOLD:
+        shortlist = _shortlist_split_edges(reflex, slav._edge_index)
+
+    events = []
+    for vertex in vertices:
+        event = vertex.next_event(shortlist.get(vertex))
+        if event is not None:
+            events.append(event)
+    return events
 
 
 def skeletonize(polygon, holes=None):
@@ -888,22 +1290,14 @@ def skeletonize(polygon, holes=None):
     slav = SLAV(polygon, holes)
     output = []
     prioque = EventQueue()
-
-    for lav in slav:
-        for vertex in lav:
-            v = vertex.next_event()
-            prioque.put(v)
+    prioque.put_all(initial_events(slav))
 
     while not (prioque.empty() or slav.empty()):
         i = prioque.get()
         if isinstance(i, EdgeEvent):
-            if not i.vertex_a.is_valid or not i.vertex_b.is_valid:
-                continue
             (arc, events) = slav.handle_edge_event(i)
 
         elif isinstance(i, SplitEvent):
-            if not i.vertex.is_valid:
-                continue
             (arc, events) = slav.handle_split_event(i)
 
         prioque.put_all(events)
@@ -912,3 +1306,777 @@ def skeletonize(polygon, holes=None):
             output.append(arc)
 
     return output
+
+
+def is_rectilinear(polygon, tolerance=1e-6):
+    """ Whether every edge of polygon is parallel to the x or the y axis,
+    within tolerance
+    """
+    return _axis_edges(polygon, tolerance) is not None
+
+
+def _axis_edges(polygon, tolerance):
+    """ Axis (0 for x, 1 for y) of every edge of polygon, None if an edge is
+    not axis aligned or a point repeats the previous one
+    """
+    if len(polygon) < 4:
+        return None
+
+    axes = []
+    for (x1, y1), (x2, y2) in zip(polygon, polygon[1:] + polygon[:1]):
+        dx, dy = abs(x2 - x1), abs(y2 - y1)
+        if dy <= tolerance < dx:
+            axes.append(0)
+        elif dx <= tolerance < dy:
+            axes.append(1)
+        else:
+            return None
+    return axes
+
+
+class _WavefrontVertex:
+    """ Vertex of a rectilinear wavefront.
+
+    Coordinates and time are integers on a grid of half the quantization
+    step, the vertex is at w + theta * d at time theta, d is the sum of the
+    inward normals of its edges (a diagonal unless both edges are collinear).
+    """
+
+    __slots__ = ("wx", "wy", "dx", "dy", "origin", "line", "prev", "next", "alive")
+
+    def __init__(self, position, theta, direction):
+        self.dx, self.dy = direction
+        self.wx = position[0] - theta * self.dx
+        self.wy = position[1] - theta * self.dy
+        self.origin = position
+        self.line = None
+        self.prev = self.next = None
+        self.alive = True
+
+    def at(self, theta):
+        return self.wx + theta * self.dx, self.wy + theta * self.dy
+
+
+class _WavefrontLine:
+    """ Moving line of an original edge, every wavefront edge that comes
+    from the original edge lies on it
+    """
+
+    __slots__ = ("axis", "sign", "normal", "offset", "lo", "hi", "pieces")
+
+    def __init__(self, start, end, axis):
+        self.axis = axis
+        self.sign = 1 if end[axis] > start[axis] else -1
+        # -- inward normal of a counter-clockwise contour, along the other axis
+        self.normal = self.sign if axis == 0 else -self.sign
+        self.offset = start[1 - axis]
+        self.lo, self.hi = sorted((start[axis], end[axis]))
+        # -- start vertices of the wavefront edges on this line
+        self.pieces = set()
+
+    def normal_vector(self):
+        return (0, self.normal) if self.axis == 0 else (self.normal, 0)
+
+    def direction(self):
+        return (self.sign, 0) if self.axis == 0 else (0, self.sign)
+
+
+class RectilinearSkeleton:
+    """ Straight skeleton of a polygon whose edges are all axis aligned.
+
+    All bisectors are diagonals, so the wavefront is propagated on an integer
+    grid: edges only collapse or meet an opposite (antiparallel) edge at
+    precomputed times, found by sweeping the sorted opposite edges. When
+    edges meet, the overlapping parts cancel into ridges and the rest of the
+    wavefront is relinked, so no general ray intersection is needed.
+
+    Raises ValueError when the polygon is not rectilinear or the wavefront
+    becomes inconsistent, in which case skeletonize should be used instead.
+    """
+
+    COLLAPSE, CONTACT = 0, 1
+
+    def __init__(self, polygon, holes=None, precision=1e-6):
+        self.precision = precision
+        self.lines = []
+        self.points = {}
+        self.output = []
+        self._queue = []
+        self._counter = it.count()
+        self._ended = {}
+
+        contours = [(polygon, 1)] + [(hole, -1) for hole in holes or []]
+        for contour, orientation in contours:
+            self._add_contour(contour, orientation)
+        self._facing = self._facing_lines()
+
+    def _add_contour(self, contour, orientation):
+        contour = [(float(x), float(y)) for x, y in contour]
+        axes = _axis_edges(contour, self.precision)
+        if axes is None:
+            raise ValueError("Polygon is not rectilinear")
+
+        # -- snap each edge to a single grid coordinate, doubled so that every
+        # skeleton node is on the grid
+        q = self.precision
+        coords = []
+        for (p1, p2), axis in zip(zip(contour, contour[1:] + contour[:1]), axes):
+            coords.append(2 * round((p1[1 - axis] + p2[1 - axis]) / (2 * q)))
+
+        points, originals = [], []
+        count = len(contour)
+        for k in range(count):
+            prev, cur = k - 1, k
+            if axes[prev] == axes[cur]:
+                # -- straight vertex, only the end points of the edge matter
+                continue
+            x = coords[prev] if axes[prev] == 1 else coords[cur]
+            y = coords[prev] if axes[prev] == 0 else coords[cur]
+            points.append((x, y))
+            originals.append(contour[k])
+
+        area = sum(
+            a[0] * b[1] - b[0] * a[1] for a, b in zip(points, points[1:] + points[:1])
+        )
+        if area * orientation < 0:
+            points.reverse()
+            originals.reverse()
+
+        lines = []
+        for a, b in zip(points, points[1:] + points[:1]):
+            if a == b or (a[0] != b[0] and a[1] != b[1]):
+                raise ValueError("Polygon is not rectilinear")
+            axis = 0 if a[1] == b[1] else 1
+            lines.append(len(self.lines))
+            self.lines.append(_WavefrontLine(a, b, axis))
+
+        vertices = []
+        for k, (point, original) in enumerate(zip(points, originals)):
+            self.points[point] = Point2(*original)
+            vertex = self._make_vertex(point, 0, lines[k - 1], lines[k])
+            vertices.append(vertex)
+
+        for k, vertex in enumerate(vertices):
+            self._link(vertex, vertices[(k + 1) % len(vertices)], lines[k])
+
+    def _facing_lines(self):
+        """ Lines moving towards -x and -y sorted by offset, every line moving
+        the other way meets the ones after its offset in this order
+        """
+        facing = []
+        for axis in (0, 1):
+            ahead = sorted(
+                (line.offset, idx)
+                for idx, line in enumerate(self.lines)
+                if line.axis == axis and line.normal < 0
+            )
+            offsets = [offset for offset, _ in ahead]
+            facing.append([idx for _, idx in ahead])
+            for idx, line in enumerate(self.lines):
+                if line.axis == axis and line.normal > 0:
+                    start = bisect.bisect_right(offsets, line.offset)
+                    self._advance(idx, start, facing[axis])
+        return facing
+
+    def _make_vertex(self, position, theta, line_in, line_out):
+        a, b = self.lines[line_in], self.lines[line_out]
+        na, nb = a.normal_vector(), b.normal_vector()
+        if a.axis == b.axis:
+            if a.sign != b.sign:
+                raise ValueError("Wavefront folds back on itself")
+            direction = na
+        else:
+            direction = (na[0] + nb[0], na[1] + nb[1])
+        return _WavefrontVertex(position, theta, direction)
+
+    def _link(self, start, end, line):
+        start.next, end.prev = end, start
+        start.line = line
+        self.lines[line].pieces.add(start)
+
+        # -- schedule the collapse of the new edge
+        axis = self.lines[line].axis
+        if axis == 0:
+            ws, we, ds, de = start.wx, end.wx, start.dx, end.dx
+        else:
+            ws, we, ds, de = start.wy, end.wy, start.dy, end.dy
+        if (de - ds) * self.lines[line].sign < 0:
+            theta, rest = divmod(we - ws, ds - de)
+            if rest:
+                raise ValueError("Edge collapses off the grid")
+            self._push(theta, self.COLLAPSE, start, end)
+
+    def _push(self, theta, kind, a, b):
+        heapq.heappush(self._queue, (theta, kind, next(self._counter), a, b))
+
+    def _advance(self, idx, k, facing):
+        """ Schedule the next line facing line idx it could meet, from k on
+        """
+        line = self.lines[idx]
+        while line.pieces and k < len(facing):
+            other = self.lines[facing[k]]
+            theta = (other.offset - line.offset) // 2
+            # -- wavefront edges on a line stay within its extent grown by theta
+            if other.pieces and other.lo - line.hi <= 2 * theta and line.lo - other.hi <= 2 * theta:
+                self._push(theta, self.CONTACT, idx, k)
+                return
+            k += 1
+
+    def _contacts(self, idx, k, theta):
+        """ Vertices of the edges on line idx and its k-th facing line that
+        overlap at theta
+        """
+        line = self.lines[idx]
+        facing = self._facing[line.axis]
+        other = self.lines[facing[k]]
+        self._advance(idx, k + 1, facing)
+
+        # -- pieces of a line never overlap each other, so sweeping both lines
+        # sorted along the axis finds every overlapping pair
+        axis = line.axis
+        spans = []
+        for side, pieces in enumerate((line.pieces, other.pieces)):
+            for start in pieces:
+                a, b = start.at(theta)[axis], start.next.at(theta)[axis]
+                spans.append((min(a, b), side, max(a, b), start))
+        spans.sort(key=lambda span: span[:2])
+
+        hot = set()
+        active = [[], []]
+        for lo, side, hi, start in spans:
+            # -- drop the pieces of the other line that end before this one
+            active[1 - side] = [span for span in active[1 - side] if span[0] >= lo]
+            for _, ostart in active[1 - side]:
+                hot.update((start, start.next, ostart, ostart.next))
+            active[side].append((hi, start))
+        return hot
+
+    def solve(self):
+        """ Propagate the wavefront, returns the list of Subtree
+        """
+        queue = self._queue
+        while queue:
+            theta = queue[0][0]
+            hot = set()
+            while queue and queue[0][0] == theta:
+                _, kind, _, a, b = heapq.heappop(queue)
+                if kind == self.COLLAPSE:
+                    if a.alive and a.next is b:
+                        hot.update((a, b))
+                else:
+                    hot |= self._contacts(a, b, theta)
+            if hot:
+                self._rebuild(hot, theta)
+        return self.output
+
+    def _point(self, position):
+        point = self.points.get(position)
+        if point is None:
+            h = self.precision / 2
+            point = self.points[position] = Point2(position[0] * h, position[1] * h)
+        return point
+
+    def _rebuild(self, hot, theta):
+        """ Replace the wavefront around the hot vertices at theta
+        """
+        sinks = {}
+
+        # -- edges touching hot vertices, end points that are not hot are kept
+        segments = []
+        for start in hot | {v.prev for v in hot}:
+            end = start.next
+            self.lines[start.line].pieces.discard(start)
+            a, b = start.at(theta), end.at(theta)
+            keep_start = None if start in hot else start
+            keep_end = None if end in hot else end
+            if a == b:
+                if keep_start or keep_end:
+                    raise ValueError("Edge collapsed without its vertices")
+                continue
+            segments.append((a, b, start.line, keep_start, keep_end))
+
+        # -- hot vertices that end up between the same edges carry on
+        self._ended = {}
+        for vertex in hot:
+            vertex.alive = False
+            key = (vertex.at(theta), vertex.prev.line, vertex.line)
+            self._ended[key] = vertex
+
+        # -- antiparallel edges on the same line cancel into ridges
+        groups = {}
+        for segment in segments:
+            axis = self.lines[segment[2]].axis
+            groups.setdefault((axis, segment[0][1 - axis]), []).append(segment)
+
+        pieces = []
+        for (axis, offset), group in groups.items():
+            if len(group) == 1:
+                pieces.extend(list(s) for s in group)
+                continue
+            for lo, hi, segment, ridge in self._cancel(axis, group):
+                a = (lo, offset) if axis == 0 else (offset, lo)
+                b = (hi, offset) if axis == 0 else (offset, hi)
+                if ridge:
+                    sinks.setdefault(b, []).append(self._point(a))
+                    sinks.setdefault(a, [])
+                    continue
+                start, end, line, keep_start, keep_end = segment
+                if self.lines[line].sign < 0:
+                    a, b = b, a
+                pieces.append(
+                    [
+                        a, b, line,
+                        keep_start if a == start else None,
+                        keep_end if b == end else None,
+                    ]
+                )
+
+        self._relink(pieces, theta)
+
+        for vertex in hot:
+            position = vertex.at(theta)
+            if not vertex.alive and position != vertex.origin:
+                sinks.setdefault(position, []).append(self._point(vertex.origin))
+
+        for position in sorted(sinks):
+            if sinks[position]:
+                self.output.append(
+                    Subtree(self._point(position), theta * self.precision / 2, sinks[position])
+                )
+
+    def _cancel(self, axis, group):
+        """ Split the segments of group along axis into (lo, hi, segment,
+        ridge) intervals, ridge where two antiparallel segments overlap
+        """
+        events = []
+        for segment in group:
+            a, b = segment[0][axis], segment[1][axis]
+            sign = self.lines[segment[2]].sign
+            events.append((min(a, b), 1, sign, segment))
+            events.append((max(a, b), 0, sign, segment))
+        events.sort(key=operator.itemgetter(0, 1))
+
+        active = {1: [], -1: []}
+        last = None
+        for x, entering, sign, segment in events:
+            if last is not None and x > last and (active[1] or active[-1]):
+                if len(active[1]) > 1 or len(active[-1]) > 1:
+                    raise ValueError("Wavefront overlaps itself")
+                if active[1] and active[-1]:
+                    yield last, x, None, True
+                else:
+                    yield last, x, (active[1] or active[-1])[0], False
+            if entering:
+                active[sign].append(segment)
+            else:
+                active[sign].remove(segment)
+            last = x
+
+    def _relink(self, pieces, theta):
+        """ Connect pieces, lists of [start, end, line, start vertex, end vertex],
+        into wavefront edges between new or kept vertices
+        """
+        outgoing, incoming = {}, {}
+        for piece in pieces:
+            if piece[3] is None:
+                outgoing.setdefault(piece[0], []).append(piece)
+            if piece[4] is None:
+                incoming.setdefault(piece[1], []).append(piece)
+        if set(outgoing) != set(incoming):
+            raise ValueError("Wavefront is not closed")
+
+        following = {}
+        for position, ins in incoming.items():
+            outs = outgoing[position]
+            if len(ins) != len(outs):
+                raise ValueError("Wavefront is not closed")
+            for piece_in, piece_out in self._pair(ins, outs):
+                line_in, line_out = piece_in[2], piece_out[2]
+                if line_in == line_out:
+                    following[id(piece_in)] = piece_out
+                    continue
+                vertex = self._ended.pop((position, line_in, line_out), None)
+                if vertex is None:
+                    vertex = self._make_vertex(position, theta, line_in, line_out)
+                vertex.alive = True
+                piece_in[4] = vertex
+                piece_out[3] = vertex
+
+        visited = 0
+        for piece in pieces:
+            start = piece[3]
+            if start is None:
+                continue
+            line = piece[2]
+            while piece[4] is None:
+                piece = following[id(piece)]
+                visited += 1
+            visited += 1
+            self._link(start, piece[4], line)
+        if visited != len(pieces):
+            raise ValueError("Wavefront is not closed")
+
+    def _pair(self, ins, outs):
+        """ Pair incoming with outgoing pieces at a node, turning as far left
+        as possible so that pinched parts of the wavefront separate
+        """
+        if len(ins) == 1:
+            return [(ins[0], outs[0])]
+
+        pairs, free = [], list(outs)
+        for piece_in in ins:
+            ux, uy = self.lines[piece_in[2]].direction()
+            ranked = sorted(
+                free,
+                key=lambda p: [(-uy, ux), (ux, uy), (uy, -ux)].index(
+                    self.lines[p[2]].direction()
+                )
+                if self.lines[p[2]].direction() != (-ux, -uy)
+                else 3,
+            )
+            pairs.append((piece_in, ranked[0]))
+            free.remove(ranked[0])
+        return pairs
+
+
+def skeletonize_rectilinear(polygon, holes=None):
+    """ Straight skeleton of a polygon with axis aligned edges, in the same
+    form as skeletonize, see RectilinearSkeleton
+    """
+    return RectilinearSkeleton(polygon, holes).solve()
+
+
+def skeletonize_footprint(polygon, holes=None):
+    """ skeletonize, through the rectilinear solver when every edge of the
+    polygon and its holes is axis aligned
+    """
+    contours = [polygon] + list(holes or [])
+    if all(is_rectilinear(contour) for contour in contours):
+        try:
+            return skeletonize_rectilinear(polygon, holes)
+        except ValueError:
+            pass
+    return skeletonize(polygon, holes or [])
+
+
+PARALLEL_THRESHOLD = 2000
+
+
+def _skeletonize_job(job):
+    return skeletonize_footprint(*job)
+
+
+def skeletonize_many(polygons, holes=None, max_workers=None):
+    """ skeletonize_footprint of every polygon, in input order.
+
+    holes, when given, holds the list of holes of each polygon. Everything
+    runs in-process unless max_workers asks for more than one process, the
+    footprints are then spread over a process pool once they add up to
+    PARALLEL_THRESHOLD vertices. Inside blender the workers are forked from
+    or started by blender itself, so the roof operator only asks for them
+    when its processes property is raised. If the pool cannot start or its
+    workers cannot import this module, everything runs in-process as well.
+    """
+    jobs = list(zip(polygons, holes or [[] for _ in polygons]))
+    size = sum(len(p) + sum(len(h) for h in hs) for p, hs in jobs)
+    if (max_workers or 1) > 1 and len(jobs) > 1 and size >= PARALLEL_THRESHOLD:
+        try:
+            with ProcessPoolExecutor(max_workers) as pool:
+                chunksize = max(1, len(jobs) // (4 * max_workers))
+                return list(pool.map(_skeletonize_job, jobs, chunksize=chunksize))
+        except (OSError, BrokenProcessPool, pickle.PicklingError):
+            pass
+    return [_skeletonize_job(job) for job in jobs]
+
+
+def skeleton_arrays(skeleton, polygon, holes=None, precision=1e-6):
+    """ Flatten the skeleton of polygon into SkeletonArrays.
+
+    Nodes are deduplicated to precision, x, y and height hold one entry per
+    node and edges the node index pairs, flattened. The vertices of polygon
+    and its holes come first, one node each in input order with height 0,
+    a node that is only ever a sink takes the lowest height of the arcs
+    ending at it.
+    """
+    x, y, height = array("d"), array("d"), array("d")
+    index = {}
+
+    def node(point, new=False):
+        key = (round(point[0] / precision), round(point[1] / precision))
+        if new or key not in index:
+            index.setdefault(key, len(x))
+            x.append(point[0])
+            y.append(point[1])
+            height.append(-1.0)
+            return len(x) - 1
+        return index[key]
+
+    for contour in [polygon] + list(holes or []):
+        for point in contour:
+            height[node(point, new=True)] = 0.0
+
+    for arc in skeleton:
+        height[node(arc.source)] = arc.height
+    # -- nodes placed so far have their height, later ones are only sinks
+    known = len(x)
+
+    edges, seen = array("l"), set()
+    for arc in skeleton:
+        source = node(arc.source)
+        for sink in arc.sinks:
+            target = node(sink)
+            if target >= known and (height[target] < 0 or height[target] > arc.height):
+                height[target] = arc.height
+            pair = (min(source, target), max(source, target))
+            if source != target and pair not in seen:
+                seen.add(pair)
+                edges.extend(pair)
+    return SkeletonArrays(x, y, height, edges)
+
+
+def skeleton_faces(skeleton, polygon, holes=None, tolerance=1e-9):
+    """ Roof faces of the SkeletonArrays of polygon, one per contour edge.
+
+    Every face is a list of node indices that starts with its contour edge
+    and runs counter-clockwise seen from above, through the skeleton edges
+    that bound it. Skeleton edges are first split at the nodes that lie on
+    them. Raises ValueError when the skeleton does not divide the polygon
+    into one face per edge, as happens for some degenerate inputs.
+    """
+    xs, ys = skeleton.x, skeleton.y
+    extent = max(max(xs) - min(xs), max(ys) - min(ys), 1.0)
+    tol = tolerance * extent
+
+    # -- contour edges with the roof on their left, contour nodes come first
+    boundary, start = [], 0
+    for k, contour in enumerate([polygon] + list(holes or [])):
+        ring = list(range(start, start + len(contour)))
+        start += len(contour)
+        area = sum(xs[a] * ys[b] - xs[b] * ys[a] for a, b in zip(ring, ring[1:] + ring[:1]))
+        if (area < 0) == (k == 0):
+            ring.reverse()
+        boundary.extend(zip(ring, ring[1:] + ring[:1]))
+    contour_nodes = start
+
+    pairs = list(zip(skeleton.edges[::2], skeleton.edges[1::2]))
+    edges = _split_at_nodes(xs, ys, pairs, boundary, tol)
+
+    around = {}
+    for a, b in edges + [tuple(sorted(e)) for e in boundary]:
+        around.setdefault(a, []).append(b)
+        around.setdefault(b, []).append(a)
+    for node, others in around.items():
+        others.sort(key=lambda o: math.atan2(ys[o] - ys[node], xs[o] - xs[node]))
+
+    contour_edges = set(boundary) | {(b, a) for a, b in boundary}
+    used, faces = set(), []
+    for a, b in boundary:
+        face, prev, cur = [a, b], a, b
+        while True:
+            # -- the sharpest left turn keeps the face on the left
+            others = around[cur]
+            nxt = others[others.index(prev) - 1]
+            if (cur, nxt) in contour_edges or (cur, nxt) in used:
+                raise ValueError("Skeleton face is not closed by the skeleton")
+            used.add((cur, nxt))
+            if nxt == a:
+                break
+            if nxt < contour_nodes or nxt in face:
+                raise ValueError("Skeleton face is not simple")
+            face.append(nxt)
+            prev, cur = cur, nxt
+        faces.append(face)
+
+    if len(used) != 2 * len(edges):
+        raise ValueError("Skeleton edges outside of the faces")
+    return faces
+
+
+def _split_at_nodes(xs, ys, pairs, boundary, tol):
+    """ Split the edges in pairs at the nodes that lie on them, return the
+    distinct edges as sorted index pairs. Raises ValueError if a node lies
+    on a boundary edge
+    """
+    segments = [(a, b, False) for a, b in pairs] + [(a, b, True) for a, b in boundary]
+    lengths = [math.hypot(xs[b] - xs[a], ys[b] - ys[a]) for a, b, _ in segments]
+    size = max(sum(lengths) / max(len(lengths), 1), 2 * tol)
+
+    def cell(x, y):
+        return int(x // size), int(y // size)
+
+    grid = {}
+    for k, (a, b, _) in enumerate(segments):
+        (cx0, cy0) = cell(min(xs[a], xs[b]) - tol, min(ys[a], ys[b]) - tol)
+        (cx1, cy1) = cell(max(xs[a], xs[b]) + tol, max(ys[a], ys[b]) + tol)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                grid.setdefault((cx, cy), []).append(k)
+
+    splits = {}
+    for node in range(len(xs)):
+        for k in grid.get(cell(xs[node], ys[node]), []):
+            a, b, on_boundary = segments[k]
+            length = lengths[k]
+            if node == a or node == b or length <= 2 * tol:
+                continue
+            dx, dy = (xs[b] - xs[a]) / length, (ys[b] - ys[a]) / length
+            px, py = xs[node] - xs[a], ys[node] - ys[a]
+            along = px * dx + py * dy
+            if tol < along < length - tol and abs(px * dy - py * dx) <= tol:
+                if on_boundary:
+                    raise ValueError("Skeleton node on the boundary")
+                splits.setdefault(k, []).append((along, node))
+
+    edges = set()
+    for k, (a, b, on_boundary) in enumerate(segments):
+        if on_boundary:
+            continue
+        chain = [a] + [node for _, node in sorted(splits.get(k, []))] + [b]
+        for u, v in zip(chain, chain[1:]):
+            edges.add((min(u, v), max(u, v)))
+    return sorted(edges)
+
+
+CacheInfo = namedtuple("CacheInfo", "hits misses maxsize currsize")
+
+
+def rectangle_gable_faces(points, flip):
+    """ Nodes (x, y, height lists), face polygons and wall polygon indices of
+    a gable over the rectangle points. The gable ends are on the long sides,
+    so the ridge spans the short way between their midpoints, flip puts them
+    on the short sides
+    """
+    ring = list(range(4))
+    area = sum(
+        points[a][0] * points[b][1] - points[b][0] * points[a][1]
+        for a, b in zip(ring, ring[1:] + ring[:1])
+    )
+    if area < 0:
+        ring.reverse()
+
+    def length(a, b):
+        return math.hypot(points[b][0] - points[a][0], points[b][1] - points[a][1])
+
+    # -- gable ends on ring[0] -> ring[1] and ring[2] -> ring[3]
+    if (length(ring[0], ring[1]) < length(ring[1], ring[2])) != flip:
+        ring = ring[1:] + ring[:1]
+
+    xs, ys = [p[0] for p in points], [p[1] for p in points]
+    heights = [0.0] * 4
+    for a, b in (ring[:2], ring[2:]):
+        xs.append((points[a][0] + points[b][0]) / 2)
+        ys.append((points[a][1] + points[b][1]) / 2)
+        heights.append(length(a, b) / 2)
+
+    polygons = [
+        [ring[0], ring[1], 4],
+        [ring[2], ring[3], 5],
+        [ring[1], ring[2], 5, 4],
+        [ring[3], ring[0], 4, 5],
+    ]
+    return (xs, ys, heights), polygons, {0, 1}
+
+
+class SkeletonCache:
+    """ Bounded LRU cache of skeletonize_footprint results.
+
+    Entries are keyed by the shape of the contours: coordinates are quantized
+    to precision and every contour is rotated to start at its smallest vertex,
+    so the same footprint hits the cache whatever vertex it starts from.
+    Results are shared between hits, so they are stored frozen: a tuple of
+    Subtree whose sinks are tuples.
+    """
+
+    def __init__(self, maxsize=32, precision=1e-6):
+        self.maxsize = maxsize
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def _contour_key(self, contour):
+        q = self.precision
+        points = [(round(x / q), round(y / q)) for x, y in contour]
+        if not points:
+            return ()
+        start = min(points)
+        return min(
+            tuple(points[i:] + points[:i]) for i, p in enumerate(points) if p == start
+        )
+
+    def key(self, polygon, holes=None):
+        """ Cache key of polygon and its holes
+        """
+        return (
+            self._contour_key(polygon),
+            tuple(self._contour_key(hole) for hole in holes or []),
+        )
+
+    def skeletonize(self, polygon, holes=None):
+        """ Return the cached skeleton of polygon, computing it on a miss
+        """
+        key = self.key(polygon, holes)
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+        self.misses += 1
+        return self._store(key, skeletonize_footprint(polygon, holes))
+
+    def skeletonize_many(self, polygons, holes=None, max_workers=None):
+        """ Return the cached skeleton of every polygon, the misses are
+        computed together through skeletonize_many with max_workers
+        """
+        holes = holes or [[] for _ in polygons]
+        keys = [self.key(polygon, hole) for polygon, hole in zip(polygons, holes)]
+
+        results, missing = {}, {}
+        for key, polygon, hole in zip(keys, polygons, holes):
+            if key in results or key in missing:
+                self.hits += 1
+            elif key in self._data:
+                self.hits += 1
+                self._data.move_to_end(key)
+                results[key] = self._data[key]
+            else:
+                self.misses += 1
+                missing[key] = (polygon, hole)
+
+        jobs = list(missing.values())
+        computed = skeletonize_many(
+            [p for p, _ in jobs], [h for _, h in jobs], max_workers=max_workers
+        )
+        for key, result in zip(missing, computed):
+            results[key] = self._store(key, result)
+        return [results[key] for key in keys]
+
+    def _store(self, key, result):
+        result = tuple(Subtree(arc.source, arc.height, tuple(arc.sinks)) for arc in result)
+        self._data[key] = result
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+        return result
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data))
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+
+skeleton_cache = SkeletonCache()
+
+
+def skeletonize_cached(polygon, holes=None):
+    """ skeletonize_footprint through the shared skeleton_cache, for operators
+    that recompute the same footprint on every redo
+    """
+    return skeleton_cache.skeletonize(polygon, holes)
+
+
+def skeletonize_many_cached(polygons, holes=None, max_workers=None):
+    """ skeletonize_many through the shared skeleton_cache
+    """
+    return skeleton_cache.skeletonize_many(polygons, holes, max_workers)